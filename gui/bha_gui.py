@@ -15,6 +15,8 @@ import cv2
 
 # =========================
 # 서버(네트워크) 스트림 URL
+#   관제 화면은 보행자 카메라 프레임을 받지 않으므로 서버가 그린 /stream 오버레이를 그대로 표시
+#   (서버는 시청자가 있을 때만 렌더링, 탐지 클라이언트는 응답의 detections 로 직접 그림)
 # =========================
 STREAM_URL = os.getenv("BHC_STREAM_URL", "http://192.168.0.155:8000/stream")
 
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import Response
+from fastapi import APIRouter, UploadFile, File, Request
+from fastapi.responses import JSONResponse
 from service import yolo
+from service.session import device_id_of
 
 router = APIRouter()
 
 @router.post("/")
-async def detect(image: UploadFile = File(...)):
-    annotated_bytes = await yolo.detect(image)
-    return Response(content=annotated_bytes, media_type="image/jpeg")
+async def detect(request: Request, image: UploadFile = File(...), device: str = None):
+    detections = await yolo.detect(image, device_id_of(request, device))
+    return JSONResponse(content={"detections": detections})   # class, confidence, bbox (클라이언트에서 직접 그림)
 print("yolo ok")
\ No newline at end of file
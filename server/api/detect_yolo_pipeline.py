@@ -1,14 +1,130 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, Request, HTTPException
 from fastapi.responses import JSONResponse
 from service import yolo_pipeline
+from service.executor import EngineBusy
+from service.session import device_id_of
+from protocol import frame_codec
+import asyncio
 
 router = APIRouter()
 
+# 기기(사용자) id: ?device= 또는 X-Device-Id 헤더 (없으면 클라이언트 IP)
+#   → 기기마다 추적기 / 스트림 / 위험 이력을 따로 유지 (service/session.py)
+
+# -----------------------
+# packed=true: 탐지 목록을 필드명 1회 + 값 배열로 압축 (키 반복 없음)
+#   {"fields": [...], "rows": [[...], ...]}
+# -----------------------
+PACKED_FIELDS = ["model", "class", "bbox", "zone", "depth_m", "track_id", "velocity", "ttc_s"]
+
+def pack_detections(detections, packed):
+    if not packed:
+        return detections
+    return {"fields": PACKED_FIELDS,
+            "rows": [[d[f] for f in PACKED_FIELDS] for d in detections]}
+
 @router.post("/")
-async def detect(color: UploadFile = File(...), depth: UploadFile = File(...)):
-    detections, states, threat_level = await yolo_pipeline.detect(color, depth)
+async def detect(request: Request, color: UploadFile = File(...), depth: UploadFile = File(...),
+                 packed: bool = False, device: str = None):
+    detections, states, threat_level = await yolo_pipeline.detect(color, depth, device_id_of(request, device))
     return JSONResponse(content={
-        "detections": detections,   # 객체별 class, depth, 위치 등
+        "detections": pack_detections(detections, packed),   # 객체별 class, depth, bbox, zone
         "states": states,           # ground_left / ground_right / head
         "threat_level": threat_level
-    })
\ No newline at end of file
+    })
+
+# -----------------------
+# BHCF 바이너리 프레임 (protocol/frame_codec.py): multipart 파싱 / PNG 디코딩 없음
+# -----------------------
+@router.post("/frame")
+async def detect_frame(request: Request, packed: bool = False, device: str = None):
+    buf = await request.body()
+    try:
+        header = frame_codec.read_header(buf)
+        detections, states, threat_level = await yolo_pipeline.detect_frame(buf, device_id_of(request, device))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content={
+        "frame_id": header.frame_id,
+        "detections": pack_detections(detections, packed),
+        "states": states,
+        "threat_level": threat_level
+    })
+
+# -----------------------
+# WebSocket 탐지 채널
+#   클라이언트 → 서버 (binary): BHCF 프레임 (text 메시지는 error 응답 후 무시)
+#   서버 → 클라이언트 (json)  : frame_id, detections, states, threat_level, dropped
+#                              처리 실패 시 frame_id(알 수 있으면), error, dropped
+#                              → 해당 프레임만 건너뛰고 연결은 유지
+#   /detect/ws?packed=true 이면 detections 를 압축 형식으로 전송
+#   최신 프레임 우선: 추론 중에 들어온 프레임은 가장 최근 것 하나만 남기고 버림
+# -----------------------
+
+@router.websocket("/ws")
+async def detect_ws(ws: WebSocket, packed: bool = False, device: str = None):
+    await ws.accept()
+    device_id = device_id_of(ws, device)
+    pending = {"data": None, "error": None, "closed": False, "dropped": 0}
+    ready = asyncio.Event()
+
+    async def receiver():
+        try:
+            while True:
+                message = await ws.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                data = message.get("bytes")
+                if data is None:
+                    # text 메시지는 건너뛰고 오류만 알림 (연결 유지)
+                    pending["error"] = "BHCF 프레임은 binary 메시지로 보내야 합니다"
+                    ready.set()
+                    continue
+                if pending["data"] is not None:
+                    pending["dropped"] += 1   # 처리 전 새 프레임 도착 → 이전 프레임 폐기
+                pending["data"] = data
+                ready.set()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            pending["closed"] = True
+            ready.set()
+
+    recv_task = asyncio.create_task(receiver())
+    try:
+        while True:
+            await ready.wait()
+            ready.clear()
+            if pending["closed"]:
+                break
+            error, pending["error"] = pending["error"], None
+            if error is not None:
+                await ws.send_json({"frame_id": None, "error": error, "dropped": pending["dropped"]})
+            data, pending["data"] = pending["data"], None
+            if data is None:
+                continue
+
+            header = None
+            try:
+                header = frame_codec.read_header(data)
+                detections, states, threat_level = await yolo_pipeline.detect_frame(data, device_id)
+            except Exception as e:
+                if not isinstance(e, (ValueError, EngineBusy)):
+                    print("❌ WS 탐지 에러:", e)
+                await ws.send_json({
+                    "frame_id": header.frame_id if header is not None else None,
+                    "error": str(e),
+                    "dropped": pending["dropped"]
+                })
+                continue
+            await ws.send_json({
+                "frame_id": header.frame_id,
+                "detections": pack_detections(detections, packed),
+                "states": states,
+                "threat_level": threat_level,
+                "dropped": pending["dropped"]
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        recv_task.cancel()
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, UploadFile, File
+from fastapi.responses import JSONResponse
+from service import yolo_add_sig
+
+router = APIRouter()
+
+@router.post("/")
+async def detect(image: UploadFile = File(...)):
+    detections, threat_level = await yolo_add_sig.detect(image)
+    return JSONResponse(content={
+        "detections": detections,   # class, confidence, bbox (클라이언트에서 직접 그림)
+        "threat_level": threat_level
+    })
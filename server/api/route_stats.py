@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from service import executor
+from service.session import sessions
+
+router = APIRouter()
+
+@router.get("/")
+async def stats():
+    # 엔진별 대기열 깊이, 우선순위 클래스별 대기 시간, 탐지 지연, 기기 세션
+    return dict(executor.stats(), sessions=sessions.stats())
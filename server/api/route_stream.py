@@ -1,23 +1,22 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-import cv2, time
+from service.session import sessions
+from service.stream_hub import PROFILES, gen_frames
 
 router = APIRouter()
-last_frame = None   # detect()에서 갱신
-
-def gen_frames():
-    global last_frame
-    while True:
-        if last_frame is None:
-            time.sleep(0.05)
-            continue
-        # YOLO 결과가 그려진 overlay 프레임을 JPEG 인코딩
-        _, buffer = cv2.imencode(".jpg", last_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-        frame_bytes = buffer.tobytes()
-        yield (b"--frame\r\n"
-               b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
-        time.sleep(0.03)  # 약 20fps 제한
 
+# 기기별 탐지 오버레이 스트림 (detect() 에서 세션 허브로 publish)
+#   device 미지정 시 연결할 때 가장 최근에 프레임을 보낸 기기 (그 기기가 멈추면 다음 기기로)
+#   아직 세션이 없으면 첫 프레임이 올 때까지 연결을 유지
 @router.get("/")
-async def video_feed():
-    return StreamingResponse(gen_frames(), media_type="multipart/x-mixed-replace;boundary=frame")
+async def video_feed(profile: str = "full", fps: float = None, device: str = None):
+    if profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile: {list(PROFILES)}")
+    def resolve():
+        session = sessions.find(device)
+        return session.hub if session is not None else None
+    return StreamingResponse(gen_frames(resolve, profile, fps), media_type="multipart/x-mixed-replace;boundary=frame")
+
+@router.get("/devices")
+async def devices():
+    return sessions.stats()
@@ -0,0 +1,46 @@
+# YOLO 백엔드(torch / onnx / openvino)별 fps 와 torch 대비 박스 일치율 (녹화 프레임 사용)
+#   일치율: torch 결과 기준 bench.match.compare (recall / precision)
+#   imgsz 는 모든 백엔드에 명시 (.pt 는 학습 imgsz, 변환 모델은 640 이 기본값이라 그대로 두면 비교가 어긋남)
+# 실행: server/ 에서  python -m bench.bench_backends <프레임 디렉터리(jpg/png)> --weights Obstacle_detect.pt
+import argparse
+import time
+
+import cv2
+from bench.match import boxes, compare, frame_files
+from service.yolo_backend import load_model
+
+
+def predict(model, frames, imgsz):
+    model(frames[0], imgsz=imgsz, conf=0.5, verbose=False)   # 워밍업
+    out = []
+    t0 = time.perf_counter()
+    for img in frames:
+        out.append(boxes(model(img, imgsz=imgsz, conf=0.5, verbose=False)[0]))
+    return out, len(frames) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("frames")
+    parser.add_argument("--weights", nargs="+", default=["Obstacle_detect.pt", "Surface_detect.pt"])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "openvino"])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    frames = [cv2.imread(f) for f in frame_files(args.frames, args.limit)]
+    print(f"{len(frames)} frames")
+    print(f"{'weights':>22} {'backend':>9} {'fps':>7} {'recall':>8} {'precision':>10} {'boxes':>6}")
+    for path in args.weights:
+        ref, fps = predict(load_model(path, "torch"), frames, args.imgsz)
+        print(f"{path:>22} {'torch':>9} {fps:>7.1f} {'-':>8} {'-':>10} {sum(len(x) for x, _ in ref):>6}")
+        for backend in args.backends:
+            if backend == "torch":
+                continue
+            got, fps = predict(load_model(path, backend), frames, args.imgsz)
+            recall, precision, n = compare(ref, got)
+            print(f"{path:>22} {backend:>9} {fps:>7.1f} {recall:>8.1%} {precision:>10.1%} {n:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# 동시 접속 보행자 수에 따른 /detect 추론 처리량 / p99 지연 측정
+# 실행: server/ 에서  python -m bench.bench_batching --clients 1 2 4 8 16
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from service import yolo_pipeline
+from service.executor import EngineBusy
+
+
+async def client_loop(frame, fps, duration, latencies):
+    period = 1.0 / fps
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        try:
+            await yolo_pipeline.run_inference(frame)
+            latencies.append(time.perf_counter() - t0)
+        except EngineBusy:
+            pass    # 대기열 초과 프레임은 거절 (batcher stats 의 rejected)
+        await asyncio.sleep(max(0.0, period - (time.perf_counter() - t0)))
+
+
+async def run(n_clients, frame, fps, duration):
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client_loop(frame, fps, duration, latencies) for _ in range(n_clients)))
+    elapsed = time.perf_counter() - t0
+    lat_ms = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(lat_ms, 50), np.percentile(lat_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--fps", type=float, default=15)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--window-ms", type=float, default=yolo_pipeline.BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=yolo_pipeline.BATCH_MAX)
+    args = parser.parse_args()
+
+    for b in yolo_pipeline.batchers.values():
+        b.window = args.window_ms / 1000.0
+        b.max_batch = args.max_batch
+        b.max_queue = args.max_batch
+
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    print(f"window={args.window_ms}ms max_batch={args.max_batch}")
+    print(f"{'clients':>8} {'fps':>8} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for n in args.clients:
+        fps, p50, p99 = asyncio.run(run(n, frame, args.fps, args.duration))
+        print(f"{n:>8} {fps:>8.1f} {p50:>9.1f} {p99:>9.1f}")
+    for path, b in yolo_pipeline.batchers.items():
+        print(path, b.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# BLIP 캡션 / VQA: fp32 vs int8 동적 양자화 결과 일치율과 지연 비교
+#   고정 이미지 세트 + 고정 질문 목록, 비교를 위해 샘플링 없이 beam search 로 생성
+#   일치율: 문장 완전 일치 비율 / 단어 집합 Jaccard 평균
+# 실행: server/ 에서  python -m bench.bench_blip_quant <이미지 디렉터리(jpg/png)>
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import GenerationConfig
+
+from service import blip, blip_quant
+
+QUESTIONS = ["what is in front of me?", "is there a car?", "how many people are there?",
+             "is the road blocked?", "what color is the traffic light?"]
+
+GEN_CFG = GenerationConfig(num_beams=3, max_new_tokens=20, do_sample=False)
+
+
+def caption(model, image):
+    inputs = blip.proc(images=image, return_tensors="pt")
+    with torch.no_grad():
+        out = model.generate(**inputs, generation_config=GEN_CFG)
+    return blip.proc.decode(out[0], skip_special_tokens=True)
+
+
+def answer(model, image, question):
+    inputs = blip.processor_c(image, question, return_tensors="pt")
+    with torch.no_grad():
+        out = model.generate(**inputs, generation_config=GEN_CFG)
+    return blip.processor_c.decode(out[0], skip_special_tokens=True)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def jaccard(a, b):
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / max(len(a | b), 1)
+
+
+def report(name, pairs, t_fp32, t_int8):
+    exact = np.mean([a == b for a, b in pairs])
+    overlap = np.mean([jaccard(a, b) for a, b in pairs])
+    print(f"{name:>8} {len(pairs):>5} {np.median(t_fp32) * 1000:>10.0f} {np.median(t_int8) * 1000:>10.0f} "
+          f"{exact:>7.1%} {overlap:>8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.images, "*.jpg")) + glob.glob(os.path.join(args.images, "*.png")))
+    images = [Image.open(f).convert("RGB") for f in files[:args.limit]]
+
+    fp32 = {"caption": blip.load_caption_fp32(blip_quant.CPU), "vqa": blip.load_vqa_fp32()}
+    t0 = time.perf_counter()
+    int8 = {"caption": blip_quant.load_model(blip.CAPTION_CACHE, blip.load_caption_fp32, blip.caption_skeleton, quant=True),
+            "vqa": blip_quant.load_model("vqa", blip.load_vqa_fp32, blip.vqa_skeleton, quant=True)}
+    print(f"int8 load {time.perf_counter() - t0:.1f}s, {len(images)} images x {len(QUESTIONS)} questions")
+
+    caps, t_cap = [], ([], [])
+    answers, t_ans = [], ([], [])
+    for img in images:
+        a, ta = timed(caption, fp32["caption"], img)
+        b, tb = timed(caption, int8["caption"], img)
+        caps.append((a, b))
+        t_cap[0].append(ta)
+        t_cap[1].append(tb)
+        for q in QUESTIONS:
+            a, ta = timed(answer, fp32["vqa"], img, q)
+            b, tb = timed(answer, int8["vqa"], img, q)
+            answers.append((a, b))
+            t_ans[0].append(ta)
+            t_ans[1].append(tb)
+
+    print(f"{'task':>8} {'n':>5} {'fp32(ms)':>10} {'int8(ms)':>10} {'exact':>7} {'jaccard':>8}")
+    report("caption", caps, *t_cap)
+    report("vqa", answers, *t_ans)
+    for a, b in caps[:5]:
+        print(f"  fp32: {a}\n  int8: {b}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# 8bit 근거리 깊이 양자화: 전송 크기 / 최악 오차 / 위험 판정 불일치율
+# 실행: server/ 에서  python -m bench.bench_depth_quant [--depth depth.npy]
+import argparse
+
+import cv2
+import numpy as np
+
+from protocol import depth_quant
+from service.hazard import severity, WARNING_M, CAUTION_M
+
+
+def synthetic_depth():
+    rng = np.random.default_rng(0)
+    yy = np.linspace(6000, 300, 480)[:, None]
+    depth = (yy + rng.normal(0, 15, (480, 640))).clip(0, 65535).astype(np.uint16)
+    depth[rng.random((480, 640)) < 0.05] = 0
+    return depth
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", help="uint16 .npy 또는 16bit .png")
+    args = parser.parse_args()
+
+    depth = synthetic_depth()
+    if args.depth:
+        depth = np.load(args.depth) if args.depth.endswith(".npy") else cv2.imread(args.depth, cv2.IMREAD_UNCHANGED)
+    H, W = depth.shape
+    _, png = cv2.imencode(".png", depth)
+
+    print(f"range {depth_quant.NEAR_MM}~{depth_quant.FAR_MM}mm, step {depth_quant.step_mm():.1f}mm, "
+          f"최악 양자화 오차 {depth_quant.max_error_mm():.1f}mm")
+    for t in (WARNING_M, CAUTION_M):
+        mm = np.array([[int(t * 1000)]], dtype=np.uint16)
+        back = depth_quant.decode_q8(depth_quant.encode_q8(mm), 1, 1)[0, 0]
+        print(f"  임계값 {t:.1f}m → 복원 {back}mm (오차 {int(back) - int(mm[0, 0]):+d}mm)")
+
+    print(f"{'format':>10} {'size(KB)':>9} {'ratio':>6} {'max err(mm)':>12} {'판정 불일치':>10}")
+    print(f"{'raw':>10} {depth.nbytes / 1024:>9.1f} {1.0:>6.1f}")
+    print(f"{'png':>10} {len(png) / 1024:>9.1f} {depth.nbytes / len(png):>6.1f}")
+
+    sev_ref = severity(depth.ravel() / 1000.0)
+    in_range = (depth > 0) & (depth <= depth_quant.FAR_MM)
+    for ds in (1, 2, 4):
+        payload = depth_quant.encode_q8(depth, downsample=ds)
+        back = depth_quant.decode_q8(payload, W, H)
+        valid = in_range & (back > 0)   # 다운샘플로 구멍과 섞인 픽셀은 판정 불일치에만 반영
+        err = np.abs(back.astype(np.int32) - depth.astype(np.int32))[valid].max()
+        mismatch = (severity(back.ravel() / 1000.0) != sev_ref).mean() * 100
+        print(f"{'q8/' + str(ds):>10} {len(payload) / 1024:>9.1f} {depth.nbytes / len(payload):>6.1f} "
+              f"{err:>12d} {mismatch:>9.2f}%")
+
+
+if __name__ == "__main__":
+    main()
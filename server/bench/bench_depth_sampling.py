@@ -0,0 +1,35 @@
+# 박스 수(1/10/50)에 따른 깊이 샘플링 비용: 기존 단일 픽셀 조회 vs patch 분위수
+# 실행: server/ 에서  python -m bench.bench_depth_sampling
+import timeit
+
+import numpy as np
+
+from service.depth import sample_depth
+
+
+def single_pixel(depth_img, xs, ys):
+    out = []
+    for cx, ref_y in zip(xs.tolist(), ys.tolist()):
+        depth_val = depth_img[ref_y, cx]
+        out.append(float(depth_val) / 1000.0 if depth_val > 0 else -1.0)
+    return out
+
+
+def main():
+    rng = np.random.default_rng(0)
+    depth_img = rng.integers(300, 8000, (480, 640), dtype=np.uint16)
+    depth_img[rng.random((480, 640)) < 0.15] = 0   # RealSense 깊이 구멍 흉내
+
+    print(f"{'boxes':>6} {'pixel(us)':>10} {'patch(us)':>10} {'pixel -1':>9} {'patch -1':>9}")
+    for n in (1, 10, 50):
+        xs = rng.integers(0, 640, n)
+        ys = rng.integers(0, 480, n)
+        t_pixel = min(timeit.repeat(lambda: single_pixel(depth_img, xs, ys), number=1000, repeat=5))
+        t_patch = min(timeit.repeat(lambda: sample_depth(depth_img, xs, ys), number=1000, repeat=5))
+        miss_pixel = sum(d < 0 for d in single_pixel(depth_img, xs, ys))
+        miss_patch = int((sample_depth(depth_img, xs, ys) < 0).sum())
+        print(f"{n:>6} {t_pixel * 1000:>10.1f} {t_patch * 1000:>10.1f} {miss_pixel:>9} {miss_patch:>9}")
+
+
+if __name__ == "__main__":
+    main()
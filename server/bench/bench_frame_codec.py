@@ -0,0 +1,74 @@
+# 업로드 포맷 비교: 기존 JPEG + PNG multipart vs BHCF 컨테이너 (raw / lz4 / zstd)
+#   클라이언트 인코딩 시간, 전송 크기, 서버 디코딩 시간
+# 실행: server/ 에서  python -m bench.bench_frame_codec [--color frame.jpg --depth depth.npy]
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from protocol import frame_codec
+
+
+def synthetic_frame():
+    # 바닥 기울기 + 노이즈 + 구멍이 있는 640x480 z16 깊이
+    rng = np.random.default_rng(0)
+    yy = np.linspace(6000, 800, 480)[:, None]
+    depth = (yy + rng.normal(0, 15, (480, 640))).clip(0, 65535).astype(np.uint16)
+    depth[rng.random((480, 640)) < 0.05] = 0
+    color = cv2.GaussianBlur(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8), (9, 9), 0)
+    return color, depth
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def legacy_encode(color, depth):
+    _, c = cv2.imencode(".jpg", color)
+    _, d = cv2.imencode(".png", depth)
+    return c.tobytes(), d.tobytes()
+
+
+def legacy_decode(parts):
+    c, d = parts
+    cv2.imdecode(np.frombuffer(c, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.imdecode(np.frombuffer(d, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--color")
+    parser.add_argument("--depth", help="uint16 .npy 또는 16bit .png")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    color, depth = synthetic_frame()
+    if args.color:
+        color = cv2.imread(args.color)
+    if args.depth:
+        depth = np.load(args.depth) if args.depth.endswith(".npy") else cv2.imread(args.depth, cv2.IMREAD_UNCHANGED)
+
+    print(f"{'format':>10} {'encode(ms)':>11} {'size(KB)':>9} {'decode(ms)':>11}")
+    parts, t_enc = timed(lambda: legacy_encode(color, depth), args.repeat)
+    _, t_dec = timed(lambda: legacy_decode(parts), args.repeat)
+    print(f"{'jpg+png':>10} {t_enc:>11.2f} {sum(map(len, parts)) / 1024:>9.1f} {t_dec:>11.2f}")
+
+    codecs = [("raw", frame_codec.DEPTH_RAW), ("lz4", frame_codec.DEPTH_LZ4), ("zstd", frame_codec.DEPTH_ZSTD)]
+    for name, codec in codecs:
+        buf, t_enc = timed(lambda: frame_codec.encode_frame(color, depth, depth_codec=codec), args.repeat)
+        if frame_codec.read_header(buf).depth_codec != codec:
+            print(f"{name:>10} (라이브러리 미설치, 건너뜀)")
+            continue
+        _, t_dec = timed(lambda: frame_codec.decode_color(frame_codec.decode_frame(buf)), args.repeat)
+        assert np.array_equal(frame_codec.decode_frame(buf).depth, depth)
+        print(f"{'bhcf-' + name:>10} {t_enc:>11.2f} {len(buf) / 1024:>9.1f} {t_dec:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# 한 프레임 안에서 독립 모델(Obstacle / Surface) 순차 실행 vs 병렬 실행 지연 비교 (코어 수별)
+#   torch 스레드 수(프로세스 전체)는 cores 로 설정, 서버와 같이 나누지 않음
+#   순차: 워커 1개가 모델을 차례로 실행
+#   병렬: 모델마다 워커 1개로 동시에 실행 (추론 중 GIL 해제)
+#   단독: 첫 번째 모델(Obstacle)만 실행 → Surface 를 건너뛰는 프레임(cadence)의 지연
+# 실행: server/ 에서  python -m bench.bench_parallel_models --cores 1 2 4 8
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from service import yolo_pipeline
+
+
+def sequential(pool, models, frame):
+    return pool.submit(lambda: [m(frame, conf=0.5, verbose=False) for m in models]).result()
+
+
+def parallel(pools, models, frame):
+    futures = [pool.submit(m, frame, conf=0.5, verbose=False) for pool, m in zip(pools, models)]
+    return [f.result() for f in futures]
+
+
+def measure(fn, repeat):
+    fn()    # 워밍업
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cores", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    models = list(yolo_pipeline.weight_models.values())
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    print(f"{len(models)} models, {os.cpu_count()} cpus")
+    print(f"{'cores':>6} {'seq(ms)':>9} {'par(ms)':>9} {'speedup':>8} {'solo(ms)':>9}")
+    for cores in args.cores:
+        torch.set_num_threads(cores)
+        pools = [ThreadPoolExecutor(1) for _ in models]
+        t_seq = measure(lambda: sequential(pools[0], models, frame), args.repeat)
+        t_par = measure(lambda: parallel(pools, models, frame), args.repeat)
+        t_solo = measure(lambda: sequential(pools[0], models[:1], frame), args.repeat)
+        for pool in pools:
+            pool.shutdown()
+        print(f"{cores:>6} {t_seq:>9.1f} {t_par:>9.1f} {t_seq / t_par:>7.2f}x {t_solo:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# ROI crop 추론 vs 전체 프레임 추론: 가중치별 지연 / 재현율 비교 (녹화 프레임 사용)
+#   재현율 기준: 전체 프레임 결과 중 위험 판정 영역(기준점이 ROI 안)에 들어가는 박스
+#   → crop 결과를 원래 좌표로 복원해 bench.match.compare 로 비교
+#   추론 인자(imgsz / conf / classes)는 파이프라인과 같은 yolo_pipeline.infer_args
+# 실행: server/ 에서  python -m bench.bench_roi_crop <프레임 디렉터리(jpg/png)>
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from bench.match import boxes, compare, frame_files
+from service import hazard, yolo_pipeline
+
+ZONES = {"ground": hazard.GROUND_ZONES, "head": hazard.HEAD_ZONES}
+
+
+def in_rules(xyxy, points, W, H):
+    # 기준점이 판정 영역 안에 있는 박스만
+    zone_map = hazard.get_zone_map(W, H)
+    cx, ref_y, top_y = hazard.ref_points(xyxy.astype(np.int32))
+    keep = np.zeros(len(xyxy), dtype=bool)
+    for point in points:
+        z = hazard.lookup_zones(zone_map, cx, ref_y if point == "ground" else top_y)
+        keep |= np.isin(z, ZONES[point])
+    return keep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("frames")
+    parser.add_argument("--limit", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = [cv2.imread(f) for f in frame_files(args.frames, args.limit)]
+    print(f"{len(frames)} frames")
+    print(f"{'weights':>22} {'crop':>20} {'full(ms)':>9} {'crop(ms)':>9} {'recall':>8} {'precision':>10} {'boxes':>6}")
+
+    for path, model in yolo_pipeline.weight_models.items():
+        points = yolo_pipeline.weight_points[path]
+        infer = yolo_pipeline.infer_args[path]
+        t_full, t_crop, ref, got = [], [], [], []
+        crop = None
+        for img in frames:
+            H, W = img.shape[:2]
+            crop = hazard.get_crop(W, H, points)
+
+            t0 = time.perf_counter()
+            full = model(img, verbose=False, **infer)[0]
+            t_full.append(time.perf_counter() - t0)
+
+            x1, y1, x2, y2 = crop if crop is not None else (0, 0, W, H)
+            t0 = time.perf_counter()
+            cropped = model(img[y1:y2, x1:x2], verbose=False, **infer)[0]
+            t_crop.append(time.perf_counter() - t0)
+
+            ref_xyxy, ref_cls = boxes(full)
+            keep = in_rules(ref_xyxy, points, W, H)
+            ref.append((ref_xyxy[keep], ref_cls[keep]))
+            got_xyxy, got_cls = boxes(cropped, (x1, y1))
+            got.append((got_xyxy, got_cls))
+
+        recall, precision, n = compare(ref, got)
+        print(f"{os.path.basename(path):>22} {str(crop):>20} {np.median(t_full) * 1000:>9.1f} "
+              f"{np.median(t_crop) * 1000:>9.1f} {recall:>8.1%} {precision:>10.1%} {n:>6}")
+
+
+if __name__ == "__main__":
+    main()
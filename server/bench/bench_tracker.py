@@ -0,0 +1,51 @@
+# 객체 수(1/10/50/100)에 따른 추적기 프레임당 비용 + id 유지율
+#   박스 순서를 매 프레임 섞어서 인덱스 기반 id(기존 방식)가 깨지는 상황을 재현
+# 실행: server/ 에서  python -m bench.bench_tracker
+import time
+
+import numpy as np
+
+from service.tracker import Tracker
+
+FRAMES = 300
+FPS = 15
+
+
+def simulate(n, rng):
+    pos = rng.uniform([0, 0], [600, 440], (n, 2))
+    vel = rng.uniform(-60, 60, (n, 2))                  # px/s
+    size = rng.uniform(20, 60, (n, 2))
+    depth = rng.uniform(2.0, 8.0, n)
+    for _ in range(FRAMES):
+        pos = pos + vel / FPS
+        depth = np.maximum(depth - 1.0 / FPS, 0.3)      # 1 m/s 로 접근
+        noise = rng.normal(0, 1.5, (n, 2))
+        xyxy = np.hstack([pos + noise, pos + noise + size])
+        order = rng.permutation(n)
+        yield order, xyxy[order], depth[order]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'tracks':>6} {'update(us)':>11} {'id kept':>8} {'live':>5}")
+    for n in (1, 10, 50, 100):
+        tracker = Tracker()
+        cls = np.zeros(n, dtype=np.int64)
+        conf = np.full(n, 0.9)
+        ids = {}
+        kept = total = 0
+        elapsed = 0.0
+        for f, (order, boxes, depth) in enumerate(simulate(n, rng)):
+            t0 = time.perf_counter()
+            tracks = tracker.update(boxes, cls, conf, depth, f / FPS)
+            elapsed += time.perf_counter() - t0
+            for obj, t in zip(order.tolist(), tracks):
+                if obj in ids:
+                    total += 1
+                    kept += ids[obj] == t.id
+                ids[obj] = t.id
+        print(f"{n:>6} {elapsed / FRAMES * 1e6:>11.1f} {kept / max(total, 1):>8.1%} {len(tracker.tracks):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# 벤치 공용: 녹화 프레임 로드 + 박스 일치율 (기준 결과 대비 recall / precision)
+#   같은 클래스끼리 IoU >= IOU_MATCH 면 일치
+#   recall: 기준 박스 중 찾은 비율 / precision: 비교 대상 박스 중 기준에 있는 비율
+import glob
+import os
+
+import numpy as np
+
+from service.tracker import iou_matrix
+
+IOU_MATCH = 0.5
+
+
+def frame_files(directory, limit, exts=("jpg", "png")):
+    files = sorted(f for ext in exts for f in glob.glob(os.path.join(directory, f"*.{ext}")))
+    return files[:limit]
+
+
+def boxes(result, offset=(0, 0)):
+    # ultralytics 결과 → (xyxy, cls), offset: crop 좌표 → 원래 프레임 좌표
+    xyxy = result.boxes.xyxy.cpu().numpy() + np.array([*offset, *offset], dtype=np.float32)
+    return xyxy, result.boxes.cls.cpu().numpy().astype(np.int64)
+
+
+def compare(ref, got):
+    # ref / got: 프레임별 (xyxy, cls) 목록 → (recall, precision, 기준 박스 수)
+    hit_ref = hit_got = n_ref = n_got = 0
+    for (rx, rc), (gx, gc) in zip(ref, got):
+        n_ref += len(rx)
+        n_got += len(gx)
+        if len(rx) and len(gx):
+            iou = iou_matrix(rx, gx)
+            iou[rc[:, None] != gc[None, :]] = 0.0
+            hit_ref += int((iou.max(axis=1) >= IOU_MATCH).sum())
+            hit_got += int((iou.max(axis=0) >= IOU_MATCH).sum())
+    return hit_ref / max(n_ref, 1), hit_got / max(n_got, 1), n_ref
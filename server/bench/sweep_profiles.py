@@ -0,0 +1,64 @@
+# 가중치별 추론 프로파일(imgsz x conf) 정확도/지연 스윕 → yolo_pipeline.MODEL_PROFILES 선택용
+#   기준: 모델 학습 imgsz, conf 0.25 결과 중 역할이 쓰는 클래스 박스
+#   recall / precision: bench.match.compare, 입력은 파이프라인과 같은 ROI crop
+#   마지막에 JPEG 축소 디코딩(1/2, 1/4) 시간 비교
+# 실행: server/ 에서  python -m bench.sweep_profiles <프레임 디렉터리(jpg)> --imgsz 320 416 512 640
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from bench.match import boxes, compare, frame_files
+from protocol import frame_codec
+from service import yolo_pipeline
+
+REF_CONF = 0.25
+
+
+def run(model, crops, args):
+    out, times = [], []
+    model(crops[0], verbose=False, **args)   # 워밍업
+    for img in crops:
+        t0 = time.perf_counter()
+        result = model(img, verbose=False, **args)[0]
+        times.append(time.perf_counter() - t0)
+        out.append(boxes(result))
+    return out, np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("frames")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[320, 416, 512, 640])
+    parser.add_argument("--conf", type=float, nargs="+", default=[0.25, 0.4, 0.5])
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    files = frame_files(args.frames, args.limit, exts=("jpg",))
+    jpegs = [open(f, "rb").read() for f in files]
+    frames = [cv2.imdecode(np.frombuffer(b, np.uint8), cv2.IMREAD_COLOR) for b in jpegs]
+    print(f"{len(frames)} frames")
+
+    for path, model in yolo_pipeline.weight_models.items():
+        crops = [yolo_pipeline.model_input(path, img) for img in frames]
+        classes = yolo_pipeline.weight_classes[path]
+        ref, _ = run(model, crops, {"imgsz": yolo_pipeline.train_imgsz(model), "conf": REF_CONF, "classes": classes})
+        print(f"\n{path}  crop={crops[0].shape[1]}x{crops[0].shape[0]}")
+        print(f"{'imgsz':>6} {'conf':>5} {'ms':>7} {'recall':>8} {'precision':>10} {'ref boxes':>10}")
+        for imgsz in args.imgsz:
+            for conf in args.conf:
+                got, ms = run(model, crops, {"imgsz": imgsz, "conf": conf, "classes": classes})
+                recall, precision, n = compare(ref, got)
+                print(f"{imgsz:>6} {conf:>5.2f} {ms:>7.1f} {recall:>8.1%} {precision:>10.1%} {n:>10}")
+
+    print(f"\n{'decode':>8} {'ms':>7}")
+    for n, flag in frame_codec.REDUCED_FLAGS.items():
+        t0 = time.perf_counter()
+        for b in jpegs:
+            cv2.imdecode(np.frombuffer(b, np.uint8), flag)
+        print(f"{'1/' + str(n):>8} {(time.perf_counter() - t0) / max(len(jpegs), 1) * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
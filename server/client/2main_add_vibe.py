@@ -4,9 +4,8 @@ import cv2
 import requests
 import threading
 import numpy as np
-import base64
 import Jetson.GPIO as GPIO
-from client_api import send_caption, send_vqa  
+from client_api import send_caption, send_vqa, draw_detections
 
 SERVER_URL = "http://192.168.0.132:8000"
 
@@ -21,7 +20,7 @@ def send_frame(frame):
     # JPEG 인코딩 후 서버 전송
     _, img_encoded = cv2.imencode(".jpg", frame)
     response = requests.post(
-        f"{SERVER_URL}/detect/",
+        f"{SERVER_URL}/detect_sig/",
         files={"image": ("frame.jpg", img_encoded.tobytes(), "image/jpeg")}
     )
     if response.status_code != 200:
@@ -46,17 +45,11 @@ def main():
             if result is None:
                 continue
 
-            # annotated 이미지 복원
-            annotated_bytes = base64.b64decode(result["annotated"])
-            nparr = np.frombuffer(annotated_bytes, np.uint8)
-            annotated = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-            if annotated is None:
-                print("❌ 서버에서 받은 이미지 디코딩 실패")
-                continue
+            # 서버가 보낸 박스 좌표로 로컬에서 직접 그림 (annotated 이미지 전송 없음)
+            draw_detections(frame, result["detections"])
 
             # 화면 출력
-            cv2.imshow("YOLO Detection (Server)", annotated)
+            cv2.imshow("YOLO Detection (Server)", frame)
 
             # 위협 수준에 따라 모터 제어
             if result["threat_level"] == "high":
@@ -21,8 +21,19 @@ import numpy as np
 import Jetson.GPIO as GPIO
 import pyrealsense2 as rs
 from client_api import send_caption, send_vqa  
+import os, sys, socket
+
+# 서버와 공유하는 프레임 포맷 (server/protocol)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from protocol import frame_codec
+
+DEPTH_CODEC = frame_codec.DEPTH_RAW   # 서버 의존성 없이 항상 복원 가능
+# DEPTH_LZ4 / DEPTH_ZSTD: 서버에도 lz4 / zstandard 가 설치돼 있어야 함 (없으면 서버가 모든 프레임을 거부)
+# 모바일 회선: DEPTH_CODEC = frame_codec.DEPTH_Q8 (0.2~4m 8bit), DEPTH_DOWNSAMPLE = 2
+DEPTH_DOWNSAMPLE = 1                  # DEPTH_Q8 에서만 사용
 
 SERVER_URL = "http://192.168.0.132:8000"
+DEVICE_ID = socket.gethostname()   # 서버에서 기기별 세션 구분 (/stream?device=...)
 
 import time 
 
@@ -54,21 +65,28 @@ GPIO.setup(BTN2_PIN, GPIO.IN)
 # -----------------------------
 # 서버 전송 함수 (color + depth)
 # -----------------------------
+def get_intrinsics(color_frame):
+    intr = color_frame.profile.as_video_stream_profile().intrinsics
+    return intr.fx, intr.fy, intr.ppx, intr.ppy
+
 def send_frames(color_frame, depth_frame):
     # numpy 변환
     color_image = np.asanyarray(color_frame.get_data())
     depth_image = np.asanyarray(depth_frame.get_data())
 
-    # 인코딩 (color는 jpg, depth는 png 보존)
-    _, color_encoded = cv2.imencode(".jpg", color_image)
-    _, depth_encoded = cv2.imencode(".png", depth_image)
+    # BHCF 컨테이너 (color는 jpg, depth는 raw/lz4 → PNG 인코딩 없음)
+    payload = frame_codec.encode_frame(
+        color_image, depth_image,
+        frame_id=color_frame.get_frame_number(),
+        intrinsics=get_intrinsics(color_frame),
+        depth_codec=DEPTH_CODEC,
+        depth_downsample=DEPTH_DOWNSAMPLE,
+    )
 
     response = requests.post(
-        f"{SERVER_URL}/detect/",
-        files={
-            "color": ("color.jpg", color_encoded.tobytes(), "image/jpeg"),
-            "depth": ("depth.png", depth_encoded.tobytes(), "image/png"),
-        }
+        f"{SERVER_URL}/detect/frame",
+        data=payload,
+        headers={"Content-Type": "application/octet-stream", "X-Device-Id": DEVICE_ID},
     )
     if response.status_code != 200:
         print("❌ 서버 오류:", response.status_code, response.text)
@@ -3,8 +3,19 @@ import requests
 import threading
 import numpy as np
 import pyrealsense2 as rs
-import socket, json
+import socket, json, time
+from collections import deque
 from client_api import send_caption, send_vqa  
+import os, sys
+
+# 서버와 공유하는 프레임 포맷 (server/protocol)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from protocol import frame_codec, udp_proto
+
+DEPTH_CODEC = frame_codec.DEPTH_RAW   # 서버 의존성 없이 항상 복원 가능
+# DEPTH_LZ4 / DEPTH_ZSTD: 서버에도 lz4 / zstandard 가 설치돼 있어야 함 (없으면 서버가 모든 프레임을 거부)
+# 모바일 회선: DEPTH_CODEC = frame_codec.DEPTH_Q8 (0.2~4m 8bit), DEPTH_DOWNSAMPLE = 2
+DEPTH_DOWNSAMPLE = 1                  # DEPTH_Q8 에서만 사용
 
 # HTTP 서버 (YOLO 결과 JSON)
 SERVER_URL = "http://192.168.0.155:8000"
@@ -12,24 +23,63 @@ SERVER_URL = "http://192.168.0.155:8000"
 # UDP 서버 (프레임 전송)
 UDP_IP = "192.168.0.155"   # 서버 IP
 UDP_PORT = 5005
+# HTTP(X-Device-Id) 와 UDP(BU 헤더 16B) 에 같은 id 사용 → 같은 세션 (/stream, /udpstream?device=...)
+DEVICE_ID = udp_proto.bounded_device_id(socket.gethostname())
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.bind(("", 0))   # 위험 응답 수신용 포트 고정
+
+# 위험 탐지 경로
+#   "http": 프레임마다 /detect/frame HTTP 요청 + 뷰잉용 UDP 별도 전송
+#   "udp" : color+depth 를 UDP 로 한 번만 전송, 위험 응답도 UDP 로 수신
+#           (서버 main_udp.py 의 UDP_DETECT = True 필요)
+DETECT_MODE = "http"
+
+# -----------------------------
+# 캡처 → 위험 결과 수신까지 지연 측정 (HTTP / UDP 경로 비교용)
+# -----------------------------
+class LatencyMeter:
+    def __init__(self, name, report_every=100):
+        self.name = name
+        self.report_every = report_every
+        self.samples = deque(maxlen=report_every)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+        self.count += 1
+        if self.count % self.report_every == 0:
+            s = np.array(self.samples)
+            print(f"⏱ {self.name} 지연 p50 {np.percentile(s, 50):.1f}ms  p99 {np.percentile(s, 99):.1f}ms")
+
+latency = LatencyMeter(DETECT_MODE)
 
 # -----------------------------
 # 서버 전송 함수 (color + depth) → HTTP
 # -----------------------------
-def send_frames(color_frame, depth_frame):
+def get_intrinsics(color_frame):
+    intr = color_frame.profile.as_video_stream_profile().intrinsics
+    return intr.fx, intr.fy, intr.ppx, intr.ppy
+
+def encode_frames(color_frame, depth_frame, capture_ts, depth_codec):
     color_image = np.asanyarray(color_frame.get_data())
     depth_image = np.asanyarray(depth_frame.get_data())
 
-    _, color_encoded = cv2.imencode(".jpg", color_image)
-    _, depth_encoded = cv2.imencode(".png", depth_image)
+    # BHCF 컨테이너 (color는 jpg, depth는 raw/lz4 → PNG 인코딩 없음)
+    return frame_codec.encode_frame(
+        color_image, depth_image,
+        frame_id=color_frame.get_frame_number(),
+        timestamp=capture_ts,
+        intrinsics=get_intrinsics(color_frame),
+        depth_codec=depth_codec,
+        depth_downsample=DEPTH_DOWNSAMPLE,
+    )
 
+def send_frames(color_frame, depth_frame, capture_ts):
+    payload = encode_frames(color_frame, depth_frame, capture_ts, DEPTH_CODEC)
     response = requests.post(
-        f"{SERVER_URL}/detect/",
-        files={
-            "color": ("color.jpg", color_encoded.tobytes(), "image/jpeg"),
-            "depth": ("depth.png", depth_encoded.tobytes(), "image/png"),
-        }
+        f"{SERVER_URL}/detect/frame",
+        data=payload,
+        headers={"Content-Type": "application/octet-stream", "X-Device-Id": DEVICE_ID},
     )
     if response.status_code != 200:
         print("❌ 서버 오류:", response.status_code, response.text)
@@ -42,7 +92,36 @@ def send_frames(color_frame, depth_frame):
 def send_udp_frame(color_frame):
     color_image = np.asanyarray(color_frame.get_data())
     _, encoded = cv2.imencode(".jpg", color_image, [cv2.IMWRITE_JPEG_QUALITY, 70])
-    sock.sendto(encoded.tobytes(), (UDP_IP, UDP_PORT))
+    # MTU 크기 조각으로 나눠 전송 (서버에서 재조립)
+    for datagram in udp_proto.fragment(encoded.tobytes(), DEVICE_ID, color_frame.get_frame_number()):
+        sock.sendto(datagram, (UDP_IP, UDP_PORT))
+
+# -----------------------------
+# UDP 위험 탐지 경로: color+depth 전송 / 위험 응답 수신
+# -----------------------------
+def send_udp_detect_frame(color_frame, depth_frame, capture_ts):
+    # 깊이 코덱은 HTTP 경로와 같은 DEPTH_CODEC (모바일 회선이면 위 설정에서 DEPTH_Q8 선택)
+    payload = encode_frames(color_frame, depth_frame, capture_ts, DEPTH_CODEC)
+    for datagram in udp_proto.fragment(payload, DEVICE_ID, color_frame.get_frame_number(),
+                                       kind=udp_proto.KIND_FRAME, timestamp=capture_ts):
+        sock.sendto(datagram, (UDP_IP, UDP_PORT))
+
+def hazard_listener():
+    while True:
+        data, _ = sock.recvfrom(2048)
+        result = udp_proto.parse_hazard(data)
+        if result is None:
+            continue
+        latency.add(time.time() - result["timestamp"])
+        handle_result(result["threat_level"], result["states"])
+
+def handle_result(threat, states, detections=None):
+    if threat == "high":
+        print("🚨 위협 감지:", detections, states)
+    elif threat == "medium":
+        print("⚠️ 주의:", detections, states)
+    else:
+        print("✅ 안전:", detections, states)
 
 # -----------------------------
 # 메인 루프
@@ -57,6 +136,9 @@ def main():
     align = rs.align(align_to)
     pipeline.start(config)
 
+    if DETECT_MODE == "udp":
+        threading.Thread(target=hazard_listener, daemon=True).start()
+
     try:
         while True:
             frames = pipeline.wait_for_frames(timeout_ms=5000)
@@ -66,7 +148,8 @@ def main():
             if not color_frame or not depth_frame:
                 print("no frame")
                 continue
-            
+            capture_ts = time.time()
+
             # numpy 변환
             color_image = np.asanyarray(color_frame.get_data())
             depth_image = np.asanyarray(depth_frame.get_data())
@@ -81,29 +164,26 @@ def main():
             cv2.imshow("RealSense Color", color_image)
             cv2.imshow("RealSense Depth", depth_colormap)
 
-            # -----------------------------
-            # YOLO 결과 (HTTP 요청)
-            # -----------------------------
-            result = send_frames(color_frame, depth_frame)
-            if result is None:
-                print("Can't send frame")
-                continue
-
-            threat = result["threat_level"]
-            detections = result["detections"]
-            states = result.get("states", {}) 
-
-            if threat == "high":
-                print("🚨 위협 감지:", detections, states)
-            elif threat == "medium":
-                print("⚠️ 주의:", detections, states)
+            if DETECT_MODE == "udp":
+                # -----------------------------
+                # color+depth 를 UDP 로 한 번만 전송 (뷰잉 + 탐지), 결과는 hazard_listener 가 처리
+                # -----------------------------
+                send_udp_detect_frame(color_frame, depth_frame, capture_ts)
             else:
-                print("✅ 안전:", detections, states)
-
-            # -----------------------------
-            # 프레임을 UDP로 전송 (실시간 뷰잉 용도)
-            # -----------------------------
-            send_udp_frame(color_frame)
+                # -----------------------------
+                # YOLO 결과 (HTTP 요청)
+                # -----------------------------
+                result = send_frames(color_frame, depth_frame, capture_ts)
+                if result is None:
+                    print("Can't send frame")
+                    continue
+                latency.add(time.time() - capture_ts)
+                handle_result(result["threat_level"], result.get("states", {}), result["detections"])
+
+                # -----------------------------
+                # 프레임을 UDP로 전송 (실시간 뷰잉 용도)
+                # -----------------------------
+                send_udp_frame(color_frame)
 
             # -----------------------------
             # 키 입력 처리 (캡션 / VQA)
@@ -0,0 +1,104 @@
+# pip install websockets
+# WebSocket 상시 연결로 color + depth 프레임 전송, 탐지 결과는 서버가 push
+# 서버는 추론 중 도착한 프레임 중 최신 것만 처리 (오래된 위험 결과가 쌓이지 않음)
+
+import cv2
+import json
+import os, sys, socket
+import threading
+import numpy as np
+import Jetson.GPIO as GPIO
+import pyrealsense2 as rs
+from websockets.sync.client import connect
+
+# 서버와 공유하는 프레임 포맷 (server/protocol)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from protocol import frame_codec
+
+DEVICE_ID = socket.gethostname()   # 서버에서 기기별 세션 구분 (/stream?device=...)
+WS_URL = f"ws://192.168.0.132:8000/detect/ws?device={DEVICE_ID}"
+DEPTH_CODEC = frame_codec.DEPTH_RAW   # 서버 의존성 없이 항상 복원 가능
+# DEPTH_LZ4 / DEPTH_ZSTD: 서버에도 lz4 / zstandard 가 설치돼 있어야 함 (없으면 서버가 모든 프레임을 거부)
+# 모바일 회선: DEPTH_CODEC = frame_codec.DEPTH_Q8 (0.2~4m 8bit), DEPTH_DOWNSAMPLE = 2
+DEPTH_DOWNSAMPLE = 1                  # DEPTH_Q8 에서만 사용
+
+# -----------------------------
+# GPIO 핀 정의
+# -----------------------------
+MOTOR1_PIN = 32
+MOTOR2_PIN = 33
+
+GPIO.setmode(GPIO.BOARD)
+GPIO.setup(MOTOR1_PIN, GPIO.OUT)
+GPIO.setup(MOTOR2_PIN, GPIO.OUT)
+
+# -----------------------------
+# 서버 결과 수신 → 진동 모터 제어
+# -----------------------------
+def receive_loop(ws):
+    for message in ws:
+        result = json.loads(message)
+        if "error" in result:
+            print("❌ 서버 처리 실패:", result.get("frame_id"), result["error"])
+            continue
+        threat = result["threat_level"]
+        states = result.get("states", {})
+
+        if threat == "high":
+            GPIO.output(MOTOR1_PIN, GPIO.HIGH)
+            GPIO.output(MOTOR2_PIN, GPIO.HIGH)
+            print("🚨 위협 감지:", result["frame_id"], states)
+        elif threat == "medium":
+            GPIO.output(MOTOR1_PIN, GPIO.HIGH)
+            GPIO.output(MOTOR2_PIN, GPIO.LOW)
+            print("⚠️ 주의:", result["frame_id"], states)
+        else:
+            GPIO.output(MOTOR1_PIN, GPIO.LOW)
+            GPIO.output(MOTOR2_PIN, GPIO.LOW)
+
+# -----------------------------
+# 메인 루프
+# -----------------------------
+def main():
+    pipeline = rs.pipeline()
+    config = rs.config()
+    config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 15)
+    config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 15)
+
+    align = rs.align(rs.stream.color)
+    pipeline.start(config)
+
+    try:
+        with connect(WS_URL, max_size=None) as ws:
+            threading.Thread(target=receive_loop, args=(ws,), daemon=True).start()
+
+            while True:
+                frames = pipeline.wait_for_frames(timeout_ms=5000)
+                aligned_frames = align.process(frames)
+                color_frame = aligned_frames.get_color_frame()
+                depth_frame = aligned_frames.get_depth_frame()
+                if not color_frame or not depth_frame:
+                    print("no frame")
+                    continue
+
+                color_image = np.asanyarray(color_frame.get_data())
+                depth_image = np.asanyarray(depth_frame.get_data())
+
+                # 응답을 기다리지 않고 계속 전송 (BHCF 컨테이너)
+                ws.send(frame_codec.encode_frame(
+                    color_image, depth_image,
+                    frame_id=color_frame.get_frame_number(),
+                    depth_codec=DEPTH_CODEC,
+                    depth_downsample=DEPTH_DOWNSAMPLE,
+                ))
+
+                cv2.imshow("RealSense Color", color_image)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+
+    finally:
+        pipeline.stop()
+        GPIO.cleanup()
+
+if __name__ == "__main__":
+    main()
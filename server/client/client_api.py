@@ -53,4 +53,23 @@ def send_vqa(frame_path):
         os.system("mpg123 answer.mp3")
 
     # 백그라운드 스레드 실행
-    threading.Thread(target=worker, daemon=True).start()
\ No newline at end of file
+    threading.Thread(target=worker, daemon=True).start()
+
+
+# 서버 탐지 결과(bbox)를 프레임에 직접 그리기
+#   detections: dict 리스트 또는 packed 형식 {"fields": [...], "rows": [...]}
+ZONE_COLORS = {"ground_left": (0, 0, 255), "ground_right": (0, 0, 255), "head": (0, 0, 180)}
+
+def draw_detections(frame, detections):
+    if isinstance(detections, dict):
+        fields = detections["fields"]
+        detections = [dict(zip(fields, row)) for row in detections["rows"]]
+    for d in detections:
+        x1, y1, x2, y2 = d["bbox"]
+        color = ZONE_COLORS.get(d.get("zone"), (0, 200, 0))
+        label = d["class"]
+        if d.get("depth_m", -1) > 0:
+            label += f":{d['depth_m']:.2f}m"
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+    return frame
@@ -4,7 +4,7 @@ import cv2
 import requests
 import threading
 import numpy as np
-from client_api import send_caption, send_vqa  
+from client_api import send_caption, send_vqa, draw_detections
 
 SERVER_URL = "http://192.168.0.132:8000"
 
@@ -15,7 +15,10 @@ def send_frame(frame):
         f"{SERVER_URL}/detect/",   # 여기서 detect 엔드포인트 붙임
         files={"image": ("frame.jpg", img_encoded.tobytes(), "image/jpeg")}
     )
-    return response.content  # annotated JPEG
+    if response.status_code != 200:
+        print("❌ 서버 오류:", response.status_code, response.text)
+        return None
+    return response.json()  # detections (class, confidence, bbox)
 
 def main():
     cap = cv2.VideoCapture(0)
@@ -28,15 +31,11 @@ def main():
         if not ret:
             break
 
-        # annotated 이미지 받아오기
-        annotated_bytes = send_frame(frame)
-        nparr = np.frombuffer(annotated_bytes, np.uint8)
-        annotated = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if annotated is None:
-            print("❌ 서버에서 받은 이미지 디코딩 실패")
+        # 서버가 보낸 박스 좌표로 로컬에서 직접 그림 (annotated 이미지 전송 없음)
+        result = send_frame(frame)
+        if result is None:
             continue
-
+        annotated = draw_detections(frame.copy(), result["detections"])
 
         # 화면 출력
         cv2.imshow("YOLO Detection (Server)", annotated)
@@ -1,15 +1,26 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from api.blip_captioning import router as caption_router
 from api.blip_qa import router as vqa_router
 # from api.detect_yolo import router as detect_router
+from api.detect_yolo_sig import router as detect_sig_router   # client/2main_add_vibe.py 용
 from api.detect_yolo_pipeline import router as detect_router
 from api.route_stream import router as stread_router
+from api.route_stats import router as stats_router
+from service.executor import EngineBusy
 
 app = FastAPI(title="YOLO + BLIP VQA Server")
 app.include_router(caption_router, prefix="/caption", tags=["caption"])
 app.include_router(vqa_router, prefix="/vqa", tags=["vqa"])
 app.include_router(detect_router, prefix="/detect", tags=["detect"])
+app.include_router(detect_sig_router, prefix="/detect_sig", tags=["detect"])
 app.include_router(stread_router, prefix="/stream", tags=["stream"])
+app.include_router(stats_router, prefix="/stats", tags=["stats"])
+
+# 추론 엔진 대기열 초과 → 503 (클라이언트는 다음 프레임으로 재시도)
+@app.exception_handler(EngineBusy)
+async def engine_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 import pymysql, socket, time, threading
 
@@ -1,53 +1,49 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, JSONResponse
 from api.blip_captioning import router as caption_router
 from api.blip_qa import router as vqa_router
 # from api.detect_yolo import router as detect_router
 from api.detect_yolo_pipeline import router as detect_router
 from api.route_stream import router as stread_router
-
-import threading, socket, cv2, numpy as np, time
+from api.route_stats import router as stats_router
+from service.executor import EngineBusy
+from service.stream_hub import PROFILES, gen_frames
+from service import udp_ingest, yolo_pipeline
 
 app = FastAPI(title="YOLO + BLIP VQA Server")
 app.include_router(caption_router, prefix="/caption", tags=["caption"])
 app.include_router(vqa_router, prefix="/vqa", tags=["vqa"])
 app.include_router(detect_router, prefix="/detect", tags=["detect"])
 # app.include_router(stread_router, prefix="/stream", tags=["stream"])
+app.include_router(stats_router, prefix="/stats", tags=["stats"])
+
+# 추론 엔진 대기열 초과 → 503 (클라이언트는 다음 프레임으로 재시도)
+@app.exception_handler(EngineBusy)
+async def engine_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 # ========== UDP 프레임 수신 ==========
 UDP_IP = "0.0.0.0"
 UDP_PORT = 5005
-last_udp_frame = None   # 브라우저 스트리밍용
+UDP_DETECT = False  # True: color+depth UDP 프레임을 바로 탐지하고 위험 패킷을 UDP 로 회신 (선택 기능)
 
-def udp_frame_listener():
-    global last_udp_frame
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((UDP_IP, UDP_PORT))
-    print(f"✅ UDP 프레임 수신 서버 실행 (포트 {UDP_PORT})")
+@app.on_event("startup")
+async def start_udp_ingest():
+    detect_fn = yolo_pipeline.detect_frame if UDP_DETECT else None
+    app.state.udp_transport, app.state.udp_protocol = await udp_ingest.start(UDP_IP, UDP_PORT, detect_fn)
 
-    while True:
-        data, addr = sock.recvfrom(65535)
-        nparr = np.frombuffer(data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if frame is not None:
-            last_udp_frame = frame
-
-# UDP 수신 스레드 시작
-threading.Thread(target=udp_frame_listener, daemon=True).start()
+@app.on_event("shutdown")
+def stop_udp_ingest():
+    app.state.udp_transport.close()
 
 # ========== FastAPI 스트리밍 엔드포인트 ==========
-def gen_udp_frames():
-    global last_udp_frame
-    while True:
-        if last_udp_frame is None:
-            time.sleep(0.05)
-            continue
-        _, buffer = cv2.imencode(".jpg", last_udp_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-        frame_bytes = buffer.tobytes()
-        yield (b"--frame\r\n"
-               b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
-        time.sleep(0.05)  # 약 20fps 제한
-
 @app.get("/udpstream")
-async def udp_video_feed():
-    return StreamingResponse(gen_udp_frames(), media_type="multipart/x-mixed-replace;boundary=frame")
\ No newline at end of file
+async def udp_video_feed(profile: str = "full", device: str = None, fps: float = None):
+    if profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile: {list(PROFILES)}")
+    # 아직 datagram 이 없으면 첫 프레임까지 대기, device 미지정 시 연결할 때의 최근 기기 (멈추면 다음 기기로)
+    return StreamingResponse(gen_frames(lambda: udp_ingest.find_channel(device), profile, fps), media_type="multipart/x-mixed-replace;boundary=frame")
+
+@app.get("/udpstream/devices")
+async def udp_devices():
+    return app.state.udp_protocol.stats()
\ No newline at end of file
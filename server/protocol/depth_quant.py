@@ -0,0 +1,57 @@
+import struct
+import cv2
+import numpy as np
+
+# -----------------------
+# 위험 판정용 8bit 깊이 양자화
+#   위험 판정은 ≤2.0m / 2.0~3.0m / 그 밖 만 구분하므로 근거리만 세밀하게 보냄
+#   code 0       : 깊이 없음 (원래 0)
+#   code 1..254  : [near_mm, far_mm] 선형 양자화 (near_mm 미만은 1)
+#   code 255     : far_mm 초과 (포화)
+#   payload = [near_mm u16][far_mm u16][downsample u8][pad][uint8 코드]
+# -----------------------
+NEAR_MM = 200
+FAR_MM = 4000
+LEVELS = 254
+CODE_FAR = 255
+
+SUBHEADER = struct.Struct("<HHBx")
+
+
+def step_mm(near_mm=NEAR_MM, far_mm=FAR_MM):
+    return (far_mm - near_mm) / (LEVELS - 1)
+
+
+def max_error_mm(near_mm=NEAR_MM, far_mm=FAR_MM):
+    # 범위 안 최악 양자화 오차 (반 스텝)
+    return step_mm(near_mm, far_mm) / 2
+
+
+def encode_q8(depth_image, near_mm=NEAR_MM, far_mm=FAR_MM, downsample=1):
+    if downsample > 1:
+        depth_image = depth_image[::downsample, ::downsample]
+    d = depth_image.astype(np.float32)
+    codes = np.clip(np.rint((d - near_mm) / step_mm(near_mm, far_mm)) + 1, 1, LEVELS).astype(np.uint8)
+    codes[d > far_mm] = CODE_FAR
+    codes[depth_image == 0] = 0
+    return SUBHEADER.pack(near_mm, far_mm, downsample) + codes.tobytes()
+
+
+def decode_q8(payload, width, height):
+    near_mm, far_mm, downsample = SUBHEADER.unpack_from(payload)
+    h = -(-height // downsample)
+    w = -(-width // downsample)
+    codes = np.frombuffer(payload, np.uint8, count=w * h, offset=SUBHEADER.size).reshape(h, w)
+
+    # 코드 → mm 조회표 (far 는 범위 바로 바깥 값으로 복원)
+    step = step_mm(near_mm, far_mm)
+    lut = np.empty(256, dtype=np.uint16)
+    lut[0] = 0
+    lut[1:LEVELS + 1] = np.rint(near_mm + np.arange(LEVELS) * step)
+    lut[LEVELS + 1:] = min(65535, int(far_mm + step))
+    depth = lut[codes]
+
+    if downsample > 1:
+        depth = cv2.resize(depth, (w * downsample, h * downsample), interpolation=cv2.INTER_NEAREST)
+        depth = depth[:height, :width]
+    return depth
@@ -0,0 +1,149 @@
+import struct
+import time
+from collections import namedtuple
+import cv2
+import numpy as np
+
+from protocol import depth_quant
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# -----------------------
+# color + depth 프레임 컨테이너 (버전 1, little-endian)
+#   [헤더][color JPEG][depth payload]
+#   depth payload 는 raw / lz4 / zstd 중 하나 → 서버는 np.frombuffer 로 바로 읽음
+#   q8 은 0~4m 근거리 8bit 양자화 (+ 선택적 다운샘플), 모바일 회선용 (protocol/depth_quant.py)
+# -----------------------
+MAGIC = b"BHCF"
+VERSION = 1
+
+DEPTH_RAW = 0
+DEPTH_LZ4 = 1
+DEPTH_ZSTD = 2
+DEPTH_Q8 = 3
+
+# flags 바이트는 예약 (정의된 비트 없음 → 0 이 아니면 거부)
+KNOWN_FLAGS = 0
+
+DEPTH_CODECS = (DEPTH_RAW, DEPTH_LZ4, DEPTH_ZSTD, DEPTH_Q8)
+
+DTYPES = {0: np.uint16, 1: np.uint8, 2: np.float32}
+DTYPE_CODES = {np.dtype(v): k for k, v in DTYPES.items()}
+
+# magic, version, flags, header_size, frame_id, timestamp, width, height,
+# depth_dtype, depth_codec, fx, fy, ppx, ppy, color_len, depth_len
+HEADER = struct.Struct("<4sBBHIdHHBB2x4fII")
+Header = namedtuple("Header", "magic version flags header_size frame_id timestamp width height "
+                              "depth_dtype depth_codec fx fy ppx ppy color_len depth_len")
+
+
+class Frame:
+    __slots__ = ("frame_id", "timestamp", "intrinsics", "color_bytes", "depth")
+
+    def __init__(self, frame_id, timestamp, intrinsics, color_bytes, depth):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.intrinsics = intrinsics    # (fx, fy, ppx, ppy)
+        self.color_bytes = color_bytes  # memoryview (JPEG)
+        self.depth = depth              # (H, W) ndarray
+
+
+def compress_depth(raw, codec):
+    if codec == DEPTH_LZ4 and lz4_frame is not None:
+        return lz4_frame.compress(raw), DEPTH_LZ4
+    if codec == DEPTH_ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=1).compress(raw), DEPTH_ZSTD
+    return raw, DEPTH_RAW   # 라이브러리가 없으면 raw 로 전송
+
+
+def decompress_depth(payload, codec):
+    if codec == DEPTH_RAW:
+        return payload
+    if codec == DEPTH_LZ4 and lz4_frame is not None:
+        return lz4_frame.decompress(payload)
+    if codec == DEPTH_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"지원하지 않는 depth codec: {codec}")
+
+
+def encode_frame(color_image, depth_image, frame_id=0, timestamp=None, intrinsics=None,
+                 depth_codec=DEPTH_RAW, jpeg_quality=95, depth_downsample=1):
+    _, color_encoded = cv2.imencode(".jpg", color_image, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    color_bytes = color_encoded.tobytes()
+
+    depth_image = np.ascontiguousarray(depth_image)
+    H, W = depth_image.shape[:2]
+    if depth_codec == DEPTH_Q8:
+        depth_payload = depth_quant.encode_q8(depth_image, downsample=depth_downsample)
+    else:
+        depth_payload, depth_codec = compress_depth(depth_image.tobytes(), depth_codec)
+
+    fx, fy, ppx, ppy = intrinsics if intrinsics is not None else (0.0, 0.0, 0.0, 0.0)
+    header = HEADER.pack(MAGIC, VERSION, 0, HEADER.size, frame_id & 0xFFFFFFFF,
+                         time.time() if timestamp is None else timestamp,
+                         W, H, DTYPE_CODES[depth_image.dtype], depth_codec,
+                         fx, fy, ppx, ppy, len(color_bytes), len(depth_payload))
+    return b"".join((header, color_bytes, depth_payload))
+
+
+def read_header(buf):
+    if len(buf) < HEADER.size:
+        raise ValueError("BHCF 프레임이 아닙니다")
+    h = Header._make(HEADER.unpack_from(buf))
+    if h.magic != MAGIC or h.version != VERSION:
+        raise ValueError("BHCF 프레임이 아닙니다")
+    # 잘못된 헤더는 모두 ValueError (API 에서 400 / WS 에서 해당 프레임만 건너뜀)
+    if h.header_size < HEADER.size:
+        raise ValueError(f"잘못된 헤더 크기: {h.header_size}")
+    if h.depth_dtype not in DTYPES:
+        raise ValueError(f"지원하지 않는 depth dtype: {h.depth_dtype}")
+    if h.depth_codec not in DEPTH_CODECS:
+        raise ValueError(f"지원하지 않는 depth codec: {h.depth_codec}")
+    if h.flags & ~KNOWN_FLAGS:
+        raise ValueError(f"알 수 없는 flags: {h.flags:#x}")
+    return h
+
+
+def decode_frame(buf):
+    buf = memoryview(buf)
+    h = read_header(buf)
+
+    color_end = h.header_size + h.color_len
+    depth_end = color_end + h.depth_len
+    if len(buf) < depth_end:
+        raise ValueError("프레임 길이가 헤더와 다릅니다")
+
+    color_bytes = buf[h.header_size:color_end]
+    try:
+        if h.depth_codec == DEPTH_Q8:
+            depth = depth_quant.decode_q8(buf[color_end:depth_end], h.width, h.height)
+        else:
+            payload = decompress_depth(buf[color_end:depth_end], h.depth_codec)
+            depth = np.frombuffer(payload, dtype=DTYPES[h.depth_dtype], count=h.width * h.height)
+            depth = depth.reshape(h.height, h.width)
+    except ValueError:
+        raise
+    except Exception as e:
+        # 손상된 압축 데이터 (lz4 / zstd / struct 오류 등)
+        raise ValueError(f"depth 복원 실패: {e}") from e
+    return Frame(h.frame_id, h.timestamp, (h.fx, h.fy, h.ppx, h.ppy), color_bytes, depth)
+
+
+# JPEG 축소 디코딩 (DCT 단계에서 1/n 로 복원, 전체 복원 후 resize 보다 빠름)
+REDUCED_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def decode_color(frame, reduce=1):
+    img = cv2.imdecode(np.frombuffer(frame.color_bytes, np.uint8), REDUCED_FLAGS[reduce])
+    if img is None:
+        raise ValueError("color JPEG 복원 실패")
+    return img
@@ -0,0 +1,184 @@
+import hashlib
+import struct
+import time
+from collections import OrderedDict
+
+# -----------------------
+# UDP 프레임 전송 프로토콜 (단편화 + 순서 번호)
+#   datagram = [헤더][조각 payload]
+#   헤더: magic, version, kind, device_id(UTF-8 16B 이하, 넘으면 ValueError), frame_id, frag_idx, frag_cnt, timestamp
+#   한 프레임(JPEG 등)을 MTU 이하 조각으로 나누고, 수신 측에서 재조립
+# -----------------------
+MAGIC = b"BU"
+VERSION = 1
+
+KIND_JPEG = 0       # color JPEG (뷰잉용)
+KIND_FRAME = 1      # BHCF color + depth 컨테이너 (뷰잉 + 위험 탐지)
+
+HEADER = struct.Struct("<2sBB16sIHHd")
+MAX_DATAGRAM = 1400                     # 경로 MTU 안쪽
+MAX_PAYLOAD = MAX_DATAGRAM - HEADER.size
+
+
+DEVICE_ID_BYTES = 16
+
+
+def pack_device_id(device_id):
+    raw = device_id.encode("utf-8")
+    if len(raw) > DEVICE_ID_BYTES:
+        # 잘라서 보내면 HTTP(X-Device-Id) 와 다른 세션이 됨 → bounded_device_id 사용
+        raise ValueError(f"device_id 는 {DEVICE_ID_BYTES} 바이트 이하여야 합니다: {device_id!r}")
+    return raw.ljust(DEVICE_ID_BYTES, b"\0")
+
+
+def bounded_device_id(name):
+    # 클라이언트용: HTTP / WS / UDP 에서 같이 쓸 16 바이트 이하 기기 id
+    #   긴 이름(호스트명 등)은 앞부분 + 해시 6자리 (문자 경계에서 자름)
+    if len(name.encode("utf-8")) <= DEVICE_ID_BYTES:
+        return name
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:6]
+    prefix = name.encode("utf-8")[:DEVICE_ID_BYTES - 7].decode("utf-8", "ignore")
+    return f"{prefix}-{digest}"
+
+
+def fragment(data, device_id, frame_id, kind=KIND_JPEG, timestamp=None):
+    ts = time.time() if timestamp is None else timestamp
+    dev = pack_device_id(device_id)
+    count = max(1, -(-len(data) // MAX_PAYLOAD))
+    if count > 0xFFFF:
+        raise ValueError("프레임이 너무 큽니다")
+    view = memoryview(data)
+    return [HEADER.pack(MAGIC, VERSION, kind, dev, frame_id & 0xFFFFFFFF, i, count, ts)
+            + view[i * MAX_PAYLOAD:(i + 1) * MAX_PAYLOAD]
+            for i in range(count)]
+
+
+def parse(datagram):
+    # BU 헤더가 아니면 None
+    if len(datagram) < HEADER.size or datagram[:2] != MAGIC:
+        return None
+    magic, version, kind, dev, frame_id, idx, count, ts = HEADER.unpack_from(datagram)
+    if version != VERSION or idx >= count:
+        return None
+    device_id = dev.rstrip(b"\0").decode("utf-8", "replace")
+    return device_id, kind, frame_id, idx, count, ts, datagram[HEADER.size:]
+
+
+class _Pending:
+    __slots__ = ("first_seen", "kind", "timestamp", "parts", "received")
+
+    def __init__(self, now, kind, timestamp, count):
+        self.first_seen = now
+        self.kind = kind
+        self.timestamp = timestamp
+        self.parts = [None] * count
+        self.received = 0
+
+
+class Reassembler:
+    # 조각 재조립: 기기별로 진행 중인 프레임을 모으고, timeout 이 지난 프레임은 폐기
+    #   device_id 는 검증되지 않은 datagram 값이므로 기기 수도 max_devices 로 제한 (LRU 제거)
+    #   진행 중 프레임이 모두 만료된 기기는 상태를 통째로 삭제
+    def __init__(self, timeout=0.3, max_pending_per_device=4, max_devices=64):
+        self.timeout = timeout
+        self.max_pending = max_pending_per_device
+        self.max_devices = max_devices
+        self.pending = OrderedDict()    # device_id -> {frame_id: _Pending}, 최근 기기가 뒤쪽
+        self.last_sweep = 0.0
+        self.completed = 0
+        self.expired = 0
+        self.evicted_devices = 0
+
+    def add(self, datagram, now=None):
+        parsed = parse(datagram)
+        if parsed is None:
+            return None
+        device_id, kind, frame_id, idx, count, ts, payload = parsed
+        now = time.monotonic() if now is None else now
+        if now - self.last_sweep > self.timeout:
+            self._sweep(now)
+
+        frames = self.pending.get(device_id)
+        if frames is None:
+            frames = self.pending[device_id] = {}
+            while len(self.pending) > self.max_devices:
+                _, dropped = self.pending.popitem(last=False)
+                self.expired += len(dropped)
+                self.evicted_devices += 1
+        else:
+            self.pending.move_to_end(device_id)
+        entry = frames.get(frame_id)
+        if entry is None:
+            self._expire(frames, now)
+            entry = frames[frame_id] = _Pending(now, kind, ts, count)
+        if len(entry.parts) != count or entry.parts[idx] is not None:
+            return None
+        entry.parts[idx] = bytes(payload)
+        entry.received += 1
+        if entry.received < count:
+            return None
+
+        del frames[frame_id]
+        # 완성된 프레임보다 먼저 시작된 미완성 프레임은 더 이상 쓸모없음
+        for fid in [f for f, e in frames.items() if e.first_seen <= entry.first_seen]:
+            del frames[fid]
+            self.expired += 1
+        if not frames:
+            del self.pending[device_id]
+        self.completed += 1
+        return device_id, frame_id, entry.kind, entry.timestamp, b"".join(entry.parts)
+
+    def _sweep(self, now):
+        # 모든 기기의 만료 프레임 정리, 남은 프레임이 없는 기기는 삭제
+        self.last_sweep = now
+        for device_id in list(self.pending):
+            frames = self.pending[device_id]
+            stale = [f for f, e in frames.items() if now - e.first_seen > self.timeout]
+            for fid in stale:
+                del frames[fid]
+            self.expired += len(stale)
+            if not frames:
+                del self.pending[device_id]
+
+    def _expire(self, frames, now):
+        stale = [f for f, e in frames.items() if now - e.first_seen > self.timeout]
+        while len(frames) - len(stale) >= self.max_pending:
+            oldest = min((f for f in frames if f not in stale), key=lambda f: frames[f].first_seen)
+            stale.append(oldest)
+        for fid in stale:
+            del frames[fid]
+            self.expired += 1
+
+
+# -----------------------
+# 위험 응답 패킷 (서버 → 보낸 기기, datagram 1개)
+#   magic, version, frame_id, 프레임 timestamp(클라이언트 시각 그대로 반환),
+#   threat_level, ground_left, ground_right, head
+# -----------------------
+HAZARD_MAGIC = b"BH"
+HAZARD = struct.Struct("<2sBIdBBBB")
+
+THREAT_LEVELS = ("low", "medium", "high")
+STATES = ("safe", "caution", "warning")
+
+
+def pack_hazard(frame_id, timestamp, threat_level, states):
+    return HAZARD.pack(HAZARD_MAGIC, VERSION, frame_id & 0xFFFFFFFF, timestamp,
+                       THREAT_LEVELS.index(threat_level),
+                       STATES.index(states["ground_left"]),
+                       STATES.index(states["ground_right"]),
+                       STATES.index(states["head"]))
+
+
+def parse_hazard(datagram):
+    if len(datagram) < HAZARD.size or datagram[:2] != HAZARD_MAGIC:
+        return None
+    _, version, frame_id, ts, threat, left, right, head = HAZARD.unpack_from(datagram)
+    if version != VERSION:
+        return None
+    return {
+        "frame_id": frame_id,
+        "timestamp": ts,
+        "threat_level": THREAT_LEVELS[threat],
+        "states": {"ground_left": STATES[left], "ground_right": STATES[right], "head": STATES[head]},
+    }
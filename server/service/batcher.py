@@ -0,0 +1,82 @@
+import asyncio
+from service.executor import EngineBusy
+
+# -----------------------
+# 마이크로 배칭: 짧은 시간창(window) 안에 들어온 프레임을 모아 한 번에 추론
+#   엔진에는 배치를 한 번에 하나씩만 넘기므로 엔진 대기열 상한이 걸리지 않음
+#   → 배치 대기열을 max_queue 프레임으로 제한하고 가득 차면 EngineBusy (503, 오래된 프레임 누적 방지)
+# -----------------------
+class MicroBatcher:
+    def __init__(self, infer_fn, window_ms=8, max_batch=8, engine=None, max_queue=None):
+        self.infer_fn = infer_fn        # list[img] -> list[result] (블로킹 함수)
+        self.engine = engine            # executor.InferenceExecutor (없으면 기본 풀)
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queue = max_queue or max_batch     # 추론 중인 배치 외에 대기할 수 있는 프레임 수
+        self.queue = None
+        self.worker = None
+        self.loop = None
+
+        # 관측용 카운터
+        self.batches = 0
+        self.frames = 0
+        self.rejected = 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self.worker is None or self.worker.done() or self.loop is not loop:
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+            self.worker = loop.create_task(self._run())
+
+    async def submit(self, img):
+        self._ensure_worker()
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((img, fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise EngineBusy(f"배치 대기열이 가득 찼습니다 ({self.max_queue} 프레임)") from None
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _infer(self, imgs):
+        if self.engine is not None:
+            return await self.engine.run(self.infer_fn, imgs)
+        return await asyncio.get_running_loop().run_in_executor(None, self.infer_fn, imgs)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            imgs = [img for img, _ in batch]
+            try:
+                results = await self._infer(imgs)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self):
+        avg = self.frames / self.batches if self.batches else 0.0
+        return {"batches": self.batches, "frames": self.frames, "avg_batch": round(avg, 2),
+                "queued": self.queue.qsize() if self.queue is not None else 0, "rejected": self.rejected}
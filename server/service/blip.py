@@ -1,4 +1,4 @@
-from transformers import BlipProcessor, BlipForQuestionAnswering, BlipForConditionalGeneration
+from transformers import BlipProcessor, BlipForQuestionAnswering, BlipForConditionalGeneration, BlipConfig
 from transformers import GenerationConfig
 
 from PIL import Image
@@ -22,24 +22,59 @@ request.add_header("X-NCP-APIGW-API-KEY-ID",client_i)
 request.add_header("X-NCP-APIGW-API-KEY",client_p)
 
 
-from peft import PeftModel
+from service.executor import get_engine, scheduler, BACKGROUND, BACKGROUND_MAX_DEFER_S
+from service import blip_fuse, blip_quant
 from transformers import BlipForConditionalGeneration, BlipProcessor, GenerationConfig,  DisjunctiveConstraint
+from transformers import StoppingCriteria, StoppingCriteriaList
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 BASE_ID = "Salesforce/blip-image-captioning-base"
 ADAPTER_DIR = "./blip_lora_adapter"
+VQA_ID = "Salesforce/blip-vqa-base"
+# 어댑터 해시는 한 번만 계산 → LoRA 병합 체크포인트 / int8 캐시 이름에 같이 사용
+#   어댑터가 바뀌면 둘 다 새로 만듦
+ADAPTER_HASH = blip_fuse.adapter_hash(ADAPTER_DIR)
+
+def load_caption_fp32(target=device):
+    # LoRA 를 합친 캡션 모델 (service/blip_fuse.py, 처음 한 번만 병합)
+    model = blip_fuse.load_fused(BlipForConditionalGeneration, BASE_ID, ADAPTER_DIR, "caption", ADAPTER_HASH)
+    print("ok2")
+    return model.to(target).float().eval()
+
+def load_vqa_fp32(target=blip_quant.CPU):
+    return BlipForQuestionAnswering.from_pretrained(VQA_ID).to(target).eval()
+
+# int8 캐시용 모델 뼈대: config 만 읽음 (LoRA 병합은 가중치만 바꾸므로 구조는 base 와 같음)
+def caption_skeleton():
+    return BlipForConditionalGeneration(BlipConfig.from_pretrained(BASE_ID))
+
+def vqa_skeleton():
+    return BlipForQuestionAnswering(BlipConfig.from_pretrained(VQA_ID))
 
 proc = BlipProcessor.from_pretrained(ADAPTER_DIR, use_fast=True)
 print("ok1")
-base = BlipForConditionalGeneration.from_pretrained(BASE_ID)
-print("ok2")
-model = PeftModel.from_pretrained(base, ADAPTER_DIR).to(device).float().eval()
+# blip_quant.BLIP_QUANT = True 이면 int8 캐시 모델 사용 (service/blip_quant.py)
+CAPTION_CACHE = f"caption-{ADAPTER_HASH}"
+model = blip_quant.load_model(CAPTION_CACHE, load_caption_fp32, caption_skeleton)
 print("ok3")
-qa_model = BlipForQuestionAnswering.from_pretrained("Salesforce/blip-vqa-base")
+qa_model = blip_quant.load_model("vqa", load_vqa_fp32, vqa_skeleton)
 print("ok4")
-processor_c = BlipProcessor.from_pretrained("Salesforce/blip-vqa-base", use_fast=True)
+processor_c = BlipProcessor.from_pretrained(VQA_ID, use_fast=True)
 print("ok5")
 
+# BLIP 생성은 수 초가 걸리므로 전용 워커에서 실행 (이벤트 루프 블로킹 방지)
+blip_engine = get_engine("blip", workers=1, max_queue=4, priority=BACKGROUND)
+
+# generate 단계마다 호출되는 양보 지점: 탐지 지연이 예산을 넘으면 잠깐씩 쉬었다가 계속
+#   (생성을 멈추지는 않음, 작업 하나당 최대 BACKGROUND_MAX_DEFER_S)
+class YieldToDetect(StoppingCriteria):
+    def __init__(self):
+        self.remaining = BACKGROUND_MAX_DEFER_S
+
+    def __call__(self, input_ids, scores, **kwargs):
+        self.remaining -= scheduler.pause_background(self.remaining)
+        return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
 
 hazard_words = ["car", "bollard", "bollards", 'pole', 'poles', 'bar', 'people', 'stairs', 'ribbon']
 hazard_ids = [proc.tokenizer(w, add_special_tokens=False).input_ids for w in hazard_words]
@@ -79,7 +114,7 @@ def db_insert(input, translated):
     remote.commit()
     remote.close()
 
-async def caption_image(image_file):
+def _caption_sync(image_bytes):
     gen_cfg = GenerationConfig(
     num_beams=3,
     max_new_tokens=20,         # 최대 토큰
@@ -89,7 +124,7 @@ async def caption_image(image_file):
     top_k=30,                  # 다음 단어 선택시 상위확률 k개만 선택. 너무 낮으면 밋밋, 너무 높으면 난잡
     )
 
-    raw_image = Image.open(io.BytesIO(await image_file.read()))
+    raw_image = Image.open(io.BytesIO(image_bytes))
     inputs = proc(images=raw_image, return_tensors="pt")
     
     model_dtype = next(model.parameters()).dtype  # torch.float32
@@ -97,7 +132,8 @@ async def caption_image(image_file):
             for k, v in inputs.items()}
     
     with torch.no_grad():
-        outputs = model.generate(**inputs, generation_config=gen_cfg)
+        outputs = model.generate(**inputs, generation_config=gen_cfg,
+                                 stopping_criteria=StoppingCriteriaList([YieldToDetect()]))
         result = translate_enko(outputs)
     # print(result)
     input = "상황 설명"
@@ -105,7 +141,12 @@ async def caption_image(image_file):
     return input, result
 
 
-async def question_image(image_file, question: str):
+async def caption_image(image_file):
+    image_bytes = await image_file.read()
+    return await blip_engine.run(_caption_sync, image_bytes)
+
+
+def _question_sync(image_bytes, question: str):
     gen_cfg = GenerationConfig(
         max_new_tokens=20,         # 최대 토큰
         do_sample=False,            # False는 그리디(안정적/단조로움). True는 높은 확률(더 사람같은 표현)
@@ -117,10 +158,11 @@ async def question_image(image_file, question: str):
     translated = GoogleTranslator(source='ko', target='en').translate(input)
     print("영어 :", translated) 
 
-    raw_image = Image.open(io.BytesIO(await image_file.read()))
+    raw_image = Image.open(io.BytesIO(image_bytes))
     inputs = processor_c(raw_image, translated, return_tensors="pt")
 
-    out = qa_model.generate(**inputs,  length_penalty=1.0,generation_config=gen_cfg, bad_words_ids=bad_ids, constraints=constraints)
+    out = qa_model.generate(**inputs,  length_penalty=1.0,generation_config=gen_cfg, bad_words_ids=bad_ids, constraints=constraints,
+                            stopping_criteria=StoppingCriteriaList([YieldToDetect()]))
     caption = proc.decode(out[0], skip_special_tokens=True)
     print("영어 :", caption)
 
@@ -129,4 +171,9 @@ async def question_image(image_file, question: str):
     db_insert(input, translated)
 
     return input, translated
+
+
+async def question_image(image_file, question: str):
+    image_bytes = await image_file.read()
+    return await blip_engine.run(_question_sync, image_bytes, question)
 print("ok6")
\ No newline at end of file
@@ -0,0 +1,52 @@
+import glob
+import hashlib
+import os
+import shutil
+from peft import PeftModel
+
+# -----------------------
+# LoRA 어댑터를 base 모델에 합친 체크포인트 (1회 생성 후 재사용)
+#   merge_and_unload: W' = W + BA 로 가중치에 직접 합침 → 추론 시 어댑터 경로 없음
+#   safetensors 로 저장 → 다음 시작부터 base 다운로드 / PEFT 래핑 없이 mmap 로드
+#   디렉터리 이름에 어댑터 해시 포함 → 어댑터가 바뀌면 새로 합침
+#   임시 디렉터리에 저장 후 os.replace → 저장 중 중단돼도 반쪽 체크포인트가 남지 않음
+#   (캐시 로드가 실패하면 지우고 다시 합침)
+# -----------------------
+FUSED_ROOT = "./blip_fused"
+
+
+def adapter_hash(adapter_dir):
+    # 시작 시 한 번만 계산해서 fused_dir / load_fused 와 양자화 캐시 이름에 같이 사용
+    paths = sorted(glob.glob(os.path.join(adapter_dir, "adapter_*")))
+    if not paths:
+        raise FileNotFoundError(f"LoRA 어댑터 파일(adapter_*)이 없습니다: {adapter_dir}")
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def fused_dir(name, digest):
+    return os.path.join(FUSED_ROOT, f"{name}-{digest}")
+
+
+def load_fused(model_cls, base_id, adapter_dir, name, digest):
+    # digest: adapter_hash(adapter_dir)
+    path = fused_dir(name, digest)
+    if os.path.exists(os.path.join(path, "model.safetensors")):
+        try:
+            return model_cls.from_pretrained(path)
+        except Exception as e:
+            print("❌ LoRA 병합 체크포인트 로드 실패, 다시 합칩니다:", e)
+
+    base = model_cls.from_pretrained(base_id)
+    model = PeftModel.from_pretrained(base, adapter_dir).merge_and_unload()
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    model.save_pretrained(tmp, safe_serialization=True)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    print(f"✅ LoRA 병합 체크포인트 저장 → {path}")
+    return model
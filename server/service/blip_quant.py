@@ -0,0 +1,49 @@
+import os
+import torch
+import transformers
+
+# -----------------------
+# BLIP INT8 동적 양자화 (CPU 전용)
+#   nn.Linear (비전 인코더 / 텍스트 디코더) 가중치를 int8 로, 활성값은 실행 시 양자화
+#   양자화된 state_dict 를 QUANT_DIR 에 저장 → 다음 시작부터 fp32 가중치 로드 없이
+#   설정(config)만으로 만든 모델 뼈대를 양자화한 뒤 state_dict 를 채움
+#   state_dict 는 weights_only=True 로 읽음 (pickle 코드 실행 없음)
+#   모듈 구조가 바뀔 수 있으므로 torch / transformers 버전이 바뀌면 새로 만듦
+# -----------------------
+BLIP_QUANT = False      # True: 캡션 / VQA 모델을 int8 로 실행
+QUANT_DIR = "./blip_int8"
+CPU = torch.device("cpu")
+
+
+def cache_path(name):
+    return os.path.join(QUANT_DIR, f"{name}-int8-torch{torch.__version__}-tf{transformers.__version__}.state.pt")
+
+
+def quantize(model):
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_model(name, build_fn, skeleton_fn, quant=None):
+    # build_fn(device): 사전학습 가중치를 읽은 fp32 모델 (양자화할 때는 CPU 로 바로 생성)
+    # skeleton_fn(): 설정만으로 만든 fp32 모델 뼈대 (캐시 state_dict 를 채울 용도)
+    quant = BLIP_QUANT if quant is None else quant
+    if not quant:
+        return build_fn()
+    if torch.cuda.is_available():
+        print(f"⚠️ {name}: int8 동적 양자화는 CPU 전용, GPU fp32 로 실행")
+        return build_fn()
+
+    path = cache_path(name)
+    if os.path.exists(path):
+        try:
+            model = quantize(skeleton_fn().eval())
+            model.load_state_dict(torch.load(path, weights_only=True))
+            return model
+        except Exception as e:
+            print(f"❌ {name} 양자화 캐시 로드 실패, 다시 만듭니다:", e)
+
+    model = quantize(build_fn(CPU).eval())
+    os.makedirs(QUANT_DIR, exist_ok=True)
+    torch.save(model.state_dict(), path)
+    print(f"✅ {name} int8 → {path}")
+    return model
@@ -0,0 +1,67 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+# -----------------------
+# 모델별 실행 주기 + 결과 캐시 (기기 세션마다 1개)
+#   주기가 안 된 모델은 마지막 결과를 그대로 사용 (깊이/영역 판정은 매 프레임 새로 계산)
+#   다음 경우에는 주기와 상관없이 다시 추론:
+#     - 캐시가 MAX_STALE_S 보다 오래됨
+#     - 카메라가 크게 움직임: 캐시 당시 썸네일과 현재 프레임의 평균 밝기 차이 > MOTION_DIFF
+# -----------------------
+MAX_STALE_S = 0.5
+MOTION_DIFF = 12.0          # 0~255 그레이스케일 평균 절대 차이
+MOTION_THUMB = (64, 48)     # 움직임 비교용 썸네일 크기
+
+
+def motion_thumb(color_img):
+    gray = cv2.cvtColor(color_img, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, MOTION_THUMB, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class ResultCache:
+    def __init__(self, max_stale=MAX_STALE_S, motion_diff=MOTION_DIFF):
+        self.max_stale = max_stale
+        self.motion_diff = motion_diff
+        self.lock = threading.Lock()
+        self.frame_no = 0
+        self.entries = {}   # key -> (frame_no, time, (thumb, shape), result)
+        self.counters = {"run": 0, "reused": 0, "stale": 0, "motion": 0}
+
+    def plan(self, color_img, cadence):
+        # cadence: {key: n} (n 프레임마다 실행) → (이번 프레임 번호, 비교 기준, 실행할 key 목록, 재사용 결과)
+        #   입력 크기가 바뀌면 (축소 복원 배율 변경 등) 캐시 박스 좌표가 맞지 않으므로 다시 추론
+        thumb = motion_thumb(color_img)
+        shape = color_img.shape[:2]
+        now = time.monotonic()
+        run, cached = [], {}
+        with self.lock:
+            self.frame_no += 1
+            for key, every in cadence.items():
+                entry = self.entries.get(key)
+                if entry is None or self.frame_no - entry[0] >= every or entry[2][1] != shape:
+                    run.append(key)
+                elif now - entry[1] > self.max_stale:
+                    self.counters["stale"] += 1
+                    run.append(key)
+                elif np.abs(thumb - entry[2][0]).mean() > self.motion_diff:
+                    self.counters["motion"] += 1
+                    run.append(key)
+                else:
+                    cached[key] = entry[3]
+            self.counters["run"] += len(run)
+            self.counters["reused"] += len(cached)
+            return self.frame_no, (thumb, shape), run, cached
+
+    def store(self, frame_no, ref, results):
+        now = time.monotonic()
+        with self.lock:
+            for key, result in results.items():
+                entry = self.entries.get(key)
+                if entry is None or entry[0] < frame_no:    # 늦게 끝난 이전 프레임 결과로 덮어쓰지 않음
+                    self.entries[key] = (frame_no, now, ref, result)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
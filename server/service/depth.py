@@ -0,0 +1,35 @@
+import numpy as np
+
+# -----------------------
+# 깊이 샘플링: 기준점 주변 patch 에서 유효 깊이(>0)의 분위수 사용
+# 한 픽셀만 보면 깊이 구멍(0)에 걸렸을 때 -1.0 이 되어 위험 판정이 꺼짐
+# -----------------------
+DEPTH_PATCH = 7         # patch 한 변 길이 (px, 홀수)
+DEPTH_PERCENTILE = 50   # 50 = 중앙값, 낮출수록 가까운 면 쪽으로 보수적
+DEPTH_MIN_VALID = 3     # 유효 픽셀이 이보다 적으면 깊이 없음(-1.0)
+
+_INVALID = np.iinfo(np.uint16).max
+
+
+def sample_depth(depth_img, xs, ys, patch=DEPTH_PATCH, percentile=DEPTH_PERCENTILE,
+                 min_valid=DEPTH_MIN_VALID):
+    # depth_img: uint16 (mm), xs/ys: 박스별 기준점 → 박스별 거리(m), 없으면 -1.0
+    n = len(xs)
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    H, W = depth_img.shape[:2]
+    r = patch // 2
+    offsets = np.arange(-r, r + 1)
+    yy = np.clip(np.asarray(ys)[:, None, None] + offsets[None, :, None], 0, H - 1)
+    xx = np.clip(np.asarray(xs)[:, None, None] + offsets[None, None, :], 0, W - 1)
+    vals = depth_img[yy, xx].reshape(n, -1)
+
+    # 0(무효)은 최댓값으로 밀어 정렬 후 유효 구간에서만 분위수 선택
+    valid = vals > 0
+    count = valid.sum(axis=1)
+    ordered = np.sort(np.where(valid, vals, _INVALID), axis=1)
+    k = np.maximum(((count - 1) * (percentile / 100.0)).round().astype(np.int64), 0)
+    depth_m = ordered[np.arange(n), k] / 1000.0
+    depth_m[count < min_valid] = -1.0
+    return depth_m
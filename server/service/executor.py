@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------
+# 추론 실행기: 엔진(YOLO/BLIP/Whisper ...)마다 전용 스레드 풀 + 제한된 대기열
+# 이벤트 루프는 I/O 만 처리하고, CPU 작업은 여기서 await 가능한 future 로 실행
+# (torch/cv2 연산은 GIL 을 놓기 때문에 프로세스 대신 스레드 풀 사용)
+# -----------------------
+class EngineBusy(RuntimeError):
+    pass
+
+
+# -----------------------
+# 우선순위 스케줄러
+#   realtime   : /detect (안전 관련, 항상 바로 실행)
+#   background : BLIP 캡션/VQA, Whisper, TTS
+#     - 탐지 지연(EWMA)이 예산을 넘으면 예산 아래로 내려올 때까지 시작을 미룸
+#     - 이미 실행 중인 작업은 pause_background 를 부르는 지점에서만 양보
+#       (BLIP: generate 단계마다, service/blip.py). Whisper / TTS 는 시작 시점 제어만 받음
+#   코어 예약은 하지 않음: torch.set_num_threads 는 스레드별이 아니라 프로세스 전체 설정이라
+#   백그라운드 워커에서 줄이면 탐지 추론 스레드도 같이 줄어듦
+# -----------------------
+REALTIME = "realtime"
+BACKGROUND = "background"
+
+DETECT_LATENCY_BUDGET_MS = 150   # 탐지 지연 예산
+BACKGROUND_MAX_DEFER_S = 3.0     # 백그라운드 작업 최대 보류 시간 (기아 방지)
+BACKGROUND_PAUSE_S = 0.005       # 실행 중 양보할 때 한 번에 쉬는 시간
+
+
+class PriorityScheduler:
+    def __init__(self, budget_ms=DETECT_LATENCY_BUDGET_MS, max_defer=BACKGROUND_MAX_DEFER_S):
+        self.budget = budget_ms / 1000.0
+        self.max_defer = max_defer
+        self.latency_ewma = 0.0
+        self.last_detect = 0.0
+        self.lock = threading.Lock()
+        self.under_budget = None    # asyncio.Event (첫 사용 시 생성)
+        self.counters = {cls: {"queued": 0, "running": 0, "completed": 0,
+                               "wait_ms_total": 0.0, "wait_ms_max": 0.0, "throttled": 0,
+                               "paused_ms": 0.0}
+                         for cls in (REALTIME, BACKGROUND)}
+
+    def _event(self):
+        if self.under_budget is None:
+            self.under_budget = asyncio.Event()
+            self.under_budget.set()
+        return self.under_budget
+
+    def record_detect_latency(self, seconds):
+        self.latency_ewma = seconds if self.latency_ewma == 0 else 0.8 * self.latency_ewma + 0.2 * seconds
+        self.last_detect = time.monotonic()
+        event = self._event()
+        if self.latency_ewma > self.budget:
+            event.clear()
+        else:
+            event.set()
+
+    def over_budget(self):
+        # 탐지 요청이 1초 이상 없으면 지연 값이 오래된 것이므로 예산 안으로 봄
+        return self.latency_ewma > self.budget and time.monotonic() - self.last_detect <= 1.0
+
+    def pause_background(self, max_pause):
+        # 워커 스레드에서 실행 중인 백그라운드 작업의 양보 지점
+        #   탐지가 예산을 넘는 동안 잠깐씩 쉼 (최대 max_pause 초) → 실제로 쉰 시간
+        paused = 0.0
+        while paused < max_pause and self.over_budget():
+            time.sleep(BACKGROUND_PAUSE_S)
+            paused += BACKGROUND_PAUSE_S
+        if paused:
+            with self.lock:
+                self.counters[BACKGROUND]["paused_ms"] += paused * 1000
+        return paused
+
+    async def admit(self, cls):
+        if cls != BACKGROUND:
+            return
+        event = self._event()
+        # 탐지 요청이 1초 이상 없으면 지연 값이 오래된 것이므로 바로 실행
+        if event.is_set() or time.monotonic() - self.last_detect > 1.0:
+            return
+        with self.lock:
+            self.counters[BACKGROUND]["throttled"] += 1
+        try:
+            await asyncio.wait_for(event.wait(), self.max_defer)
+        except asyncio.TimeoutError:
+            pass
+
+    def on_queued(self, cls):
+        with self.lock:
+            self.counters[cls]["queued"] += 1
+
+    def on_cancelled(self, cls):
+        with self.lock:
+            self.counters[cls]["queued"] -= 1
+
+    def on_start(self, cls, wait_s):
+        wait_ms = wait_s * 1000
+        with self.lock:
+            c = self.counters[cls]
+            c["queued"] -= 1
+            c["running"] += 1
+            c["wait_ms_total"] += wait_ms
+            c["wait_ms_max"] = max(c["wait_ms_max"], wait_ms)
+
+    def on_done(self, cls):
+        with self.lock:
+            c = self.counters[cls]
+            c["running"] -= 1
+            c["completed"] += 1
+
+    def stats(self):
+        with self.lock:
+            out = {"detect_latency_ms": round(self.latency_ewma * 1000, 1),
+                   "budget_ms": round(self.budget * 1000, 1)}
+            for cls, c in self.counters.items():
+                done = c["completed"] + c["running"]
+                out[cls] = dict(c, wait_ms_avg=round(c["wait_ms_total"] / done, 2) if done else 0.0)
+            return out
+
+
+scheduler = PriorityScheduler()
+
+
+class InferenceExecutor:
+    def __init__(self, name, workers=1, max_queue=8, initializer=None, priority=REALTIME):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.priority = priority
+        self.pool = ThreadPoolExecutor(max_workers=workers,
+                                       thread_name_prefix=f"infer-{name}",
+                                       initializer=initializer)
+        self.lock = threading.Lock()
+        self.pending = 0    # 실행 중 + 대기 중인 작업 수
+
+    def _call(self, fn, args, enqueued):
+        scheduler.on_start(self.priority, time.perf_counter() - enqueued)
+        try:
+            return fn(*args)
+        finally:
+            scheduler.on_done(self.priority)
+
+    def _release(self):
+        with self.lock:
+            self.pending -= 1
+
+    def _on_done(self, fut):
+        # 풀에서 시작 전에 취소된 작업은 _call 이 실행되지 않으므로 대기 카운터를 여기서 정리
+        # pending 은 작업이 실제로 끝난(또는 취소된) 뒤에만 줄임 → workers + max_queue 상한 유지
+        if fut.cancelled():
+            scheduler.on_cancelled(self.priority)
+        self._release()
+
+    async def run(self, fn, *args):
+        with self.lock:
+            if self.pending >= self.workers + self.max_queue:
+                raise EngineBusy(f"{self.name} 엔진 대기열이 가득 찼습니다")
+            self.pending += 1
+        enqueued = time.perf_counter()
+        scheduler.on_queued(self.priority)
+        try:
+            await scheduler.admit(self.priority)
+            fut = self.pool.submit(self._call, fn, args, enqueued)
+        except BaseException:
+            scheduler.on_cancelled(self.priority)
+            self._release()
+            raise
+        fut.add_done_callback(self._on_done)
+        # 기다리던 요청이 취소되면 wrap_future 가 풀의 future 도 취소 (이미 실행 중이면 끝까지 실행)
+        return await asyncio.wrap_future(fut)
+
+    def stats(self):
+        return {"priority": self.priority, "workers": self.workers,
+                "pending": self.pending, "max_queue": self.max_queue}
+
+
+engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(name, workers=1, max_queue=8, initializer=None, priority=REALTIME):
+    # 같은 이름은 같은 엔진 공유. 다른 설정으로 다시 요청하면 import 순서에 따라
+    # 설정이 달라지므로 에러 (모듈마다 고유한 이름 사용)
+    with _engines_lock:
+        engine = engines.get(name)
+        if engine is None:
+            engine = engines[name] = InferenceExecutor(name, workers, max_queue, initializer, priority)
+        elif (engine.workers, engine.max_queue, engine.priority) != (workers, max_queue, priority):
+            raise ValueError(f"{name} 엔진 설정 충돌: workers={engine.workers}, max_queue={engine.max_queue}, "
+                             f"priority={engine.priority} 로 이미 생성됨")
+        return engine
+
+
+def stats():
+    return {"scheduler": scheduler.stats(),
+            "engines": {name: e.stats() for name, e in engines.items()}}
@@ -0,0 +1,133 @@
+from functools import lru_cache
+import cv2
+import numpy as np
+
+# -----------------------
+# ROI 함수
+# -----------------------
+def get_ground_roi(W, H):
+    bottom_width = 0.7
+    top_width = 0.3
+    cx = W // 2
+    cy_bottom = H
+    cy_top = int(H * 0.7)
+
+    bl = (int(cx - W * bottom_width / 2), cy_bottom)
+    br = (int(cx + W * bottom_width / 2), cy_bottom)
+    tr = (int(cx + W * top_width / 2), cy_top)
+    tl = (int(cx - W * top_width / 2), cy_top)
+
+    roi = np.array([[bl, br, tr, tl]], dtype=np.int32)
+    left_poly = np.array([[bl, (cx, cy_bottom), (cx, cy_top), tl]], dtype=np.int32)
+    right_poly = np.array([[(cx, cy_bottom), br, tr, (cx, cy_top)]], dtype=np.int32)
+
+    return roi, left_poly, right_poly, cy_top
+
+def get_head_roi(W, H, top_width_ratio=0.8, bottom_width_ratio=0.4):
+    top_y = 0
+    bottom_y = int(H * 0.25)
+    cx = W // 2
+    top_half = int(W * top_width_ratio / 2)
+    bottom_half = int(W * bottom_width_ratio / 2)
+
+    roi_points = np.array([[
+        (cx - top_half, top_y),
+        (cx + top_half, top_y),
+        (cx + bottom_half, bottom_y),
+        (cx - bottom_half, bottom_y)
+    ]], dtype=np.int32)
+
+    return roi_points
+
+@lru_cache(maxsize=8)
+def get_rois(W, H):
+    _, ground_left, ground_right, _ = get_ground_roi(W, H)
+    return ground_left, ground_right, get_head_roi(W, H)
+
+# -----------------------
+# 모델 입력 crop 영역: 판정에 쓰는 ROI 들의 외접 사각형 + 여유(CROP_MARGIN)
+#   ROI 경계에 걸친 박스가 잘리지 않도록 사방으로 여유를 둠
+#   crop 이 프레임의 CROP_MAX_AREA 보다 크면 None (전체 프레임 사용)
+# -----------------------
+CROP_MARGIN = 0.1
+CROP_MAX_AREA = 0.75
+
+@lru_cache(maxsize=32)
+def get_crop(W, H, points):
+    # points: 판정 기준점 종류 ("ground", "head") → (x1, y1, x2, y2) 또는 None
+    ground_left, ground_right, head_roi = get_rois(W, H)
+    polys = []
+    if "ground" in points:
+        polys += [ground_left, ground_right]
+    if "head" in points:
+        polys.append(head_roi)
+    pts = np.concatenate([p.reshape(-1, 2) for p in polys])
+    mx, my = int(W * CROP_MARGIN), int(H * CROP_MARGIN)
+    x1, y1 = np.maximum(pts.min(axis=0) - (mx, my), 0)
+    x2, y2 = np.minimum(pts.max(axis=0) + (mx, my), (W, H))
+    if (x2 - x1) * (y2 - y1) > CROP_MAX_AREA * W * H:
+        return None
+    return int(x1), int(y1), int(x2), int(y2)
+
+# -----------------------
+# 영역 라벨 맵: 해상도(W, H)마다 한 번만 만들어 LRU 캐시
+#   각 픽셀 → 없음 / 하단-좌 / 하단-우 / 상단
+# -----------------------
+ZONE_NONE, ZONE_LEFT, ZONE_RIGHT, ZONE_HEAD = 0, 1, 2, 3
+ZONE_NAMES = (None, "ground_left", "ground_right", "head")
+GROUND_ZONES = (ZONE_LEFT, ZONE_RIGHT)
+HEAD_ZONES = (ZONE_HEAD,)
+
+@lru_cache(maxsize=8)
+def get_zone_map(W, H):
+    ground_left, ground_right, head_roi = get_rois(W, H)
+    zone_map = np.zeros((H, W), dtype=np.uint8)
+    cv2.fillPoly(zone_map, ground_right, ZONE_RIGHT)
+    cv2.fillPoly(zone_map, ground_left, ZONE_LEFT)  # 가운데 경계선은 좌측 우선 (기존 if/elif 순서)
+    cv2.fillPoly(zone_map, head_roi, ZONE_HEAD)
+    zone_map.setflags(write=False)
+    return zone_map
+
+def lookup_zones(zone_map, xs, ys):
+    H, W = zone_map.shape
+    return zone_map[np.clip(ys, 0, H - 1), np.clip(xs, 0, W - 1)]
+
+# -----------------------
+# 박스 기준점: 중심 x, 하단에서 1/8 올라간 y(지면 접점), 상단 y
+# -----------------------
+def ref_points(xyxy):
+    x1, y1, x2, y2 = xyxy[:, 0], xyxy[:, 1], xyxy[:, 2], xyxy[:, 3]
+    cx = (x1 + x2) // 2
+    ref_y = (y2 - (y2 - y1) * 0.125).astype(np.int32)
+    return cx, ref_y, y1
+
+# -----------------------
+# 거리 → 위험도 (0: safe, 1: caution, 2: warning)
+# -----------------------
+WARNING_M = 2.0
+CAUTION_M = 3.0
+STATE_NAMES = ("safe", "caution", "warning")
+
+def severity(depth_m):
+    sev = np.zeros(len(depth_m), dtype=np.int8)
+    sev[(depth_m > WARNING_M) & (depth_m <= CAUTION_M)] = 1
+    sev[(depth_m > 0) & (depth_m <= WARNING_M)] = 2
+    return sev
+
+def zone_states(zones, sev):
+    # 영역마다 가장 높은 위험도를 최종 상태로 사용 (박스 순서와 무관)
+    level = np.zeros(4, dtype=np.int8)
+    if len(zones):
+        np.maximum.at(level, zones, sev)
+    return {
+        "ground_left": STATE_NAMES[level[ZONE_LEFT]],
+        "ground_right": STATE_NAMES[level[ZONE_RIGHT]],
+        "head": STATE_NAMES[level[ZONE_HEAD]],
+    }
+
+def threat_level(states):
+    if "warning" in states.values():
+        return "high"
+    if "caution" in states.values():
+        return "medium"
+    return "low"
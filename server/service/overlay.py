@@ -0,0 +1,62 @@
+import threading
+import cv2
+import numpy as np
+from service import hazard
+
+# -----------------------
+# ROI 시각화 (스트림 시청자가 있을 때만 stream_hub 에서 호출)
+#   해상도별로 미리 할당한 버퍼를 재사용 (프레임마다 copy / 새 배열 생성 없음)
+#   결과 버퍼는 2개를 번갈아 사용 → 직전 결과를 인코딩 중이어도 덮어쓰지 않음
+#   반환된 버퍼는 허브가 frame 으로 캐시하므로 렌더러는 허브(세션)마다 하나씩 사용
+#   (공유하면 다른 기기의 렌더링이 캐시된 프레임을 덮어씀)
+# -----------------------
+STATE_COLORS = {
+    "safe": (0, 255, 0),
+    "caution": (0, 255, 255),
+    "warning": (0, 0, 255),
+}
+
+def state_to_color(state):
+    return STATE_COLORS.get(state, (50, 50, 50))
+
+
+class OverlayRenderer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buffers = {}   # (W, H) -> [overlay, display0, display1, 다음 display 인덱스]
+
+    def _buffers(self, W, H):
+        bufs = self.buffers.get((W, H))
+        if bufs is None:
+            bufs = self.buffers[(W, H)] = [np.empty((H, W, 3), np.uint8),
+                                           np.empty((H, W, 3), np.uint8),
+                                           np.empty((H, W, 3), np.uint8), 0]
+        return bufs
+
+    def render(self, color_img, states):
+        H, W = color_img.shape[:2]
+        ground_left, ground_right, head_roi = hazard.get_rois(W, H)
+        left_color = state_to_color(states["ground_left"])
+        right_color = state_to_color(states["ground_right"])
+        head_color = state_to_color(states["head"])
+
+        with self.lock:
+            bufs = self._buffers(W, H)
+            overlay, display = bufs[0], bufs[1 + bufs[3]]
+            bufs[3] ^= 1
+
+            np.copyto(overlay, color_img)
+            cv2.fillPoly(overlay, ground_left, left_color)
+            cv2.fillPoly(overlay, ground_right, right_color)
+            cv2.fillPoly(overlay, head_roi, head_color)
+
+            cv2.addWeighted(overlay, 0.35, color_img, 0.65, 0, dst=display)
+            cv2.polylines(display, ground_left, True, left_color, 2)
+            cv2.polylines(display, ground_right, True, right_color, 2)
+            cv2.polylines(display, head_roi, True, head_color, 2)
+
+            cv2.putText(display,
+                        f"Ground-L: {states['ground_left']}  Ground-R: {states['ground_right']}  Head: {states['head']}",
+                        (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
+        return display
+
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from service.cadence import ResultCache
+from service.overlay import OverlayRenderer
+from service.stream_hub import FrameHub
+from service.tracker import Tracker
+
+# -----------------------
+# 기기(사용자)별 세션 상태
+#   추적기 / 스트림 허브 / 위험 이력을 기기 id 마다 따로 보관
+#   → 여러 보행자가 동시에 접속해도 궤적·스트림 프레임이 섞이지 않음
+#   - 저장소 잠금은 세션 생성/삭제에만 사용, 세션 내부 상태는 세션별 잠금
+#   - SESSION_IDLE_S 동안 프레임이 없으면 제거, MAX_SESSIONS 초과 시 가장 오래된 세션 제거
+#     (스트림 시청자가 있는 세션은 제거하지 않음)
+#   - 세션 메모리 상한: 추적기(MAX_TRACKS x MAX_HISTORY) + 위험 이력 HAZARD_HISTORY 개
+#     + 허브의 최신 프레임 1장 + 모델별 캐시 결과 1개
+# -----------------------
+SESSION_IDLE_S = 60.0
+MAX_SESSIONS = 64
+HAZARD_HISTORY = 30
+EVICT_INTERVAL_S = 5.0
+DEFAULT_DEVICE = "default"
+
+
+class Session:
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.created = self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+        self.trackers = {}                      # role -> Tracker
+        self.cadence = ResultCache()            # 모델별 실행 주기 / 결과 캐시
+        self.hub = FrameHub()                   # 탐지 오버레이 (/stream)
+        self.overlay = OverlayRenderer()        # hub 전용 오버레이 버퍼
+        self.raw_hub = FrameHub()               # UDP 원본 JPEG (/udpstream)
+        self.hazard_history = deque(maxlen=HAZARD_HISTORY)   # (time, threat_level, states)
+        self.frames = 0
+
+    def watched(self):
+        # /stream 또는 /udpstream 시청자가 있는 세션 (제거하면 시청자가 버려진 허브를 기다림)
+        return self.hub.viewers > 0 or self.raw_hub.viewers > 0
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def tracker(self, role):
+        tracker = self.trackers.get(role)
+        if tracker is None:
+            with self.lock:
+                tracker = self.trackers.setdefault(role, Tracker())
+        return tracker
+
+    def record(self, states, threat_level):
+        with self.lock:
+            self.frames += 1
+            self.hazard_history.append((time.time(), threat_level, states))
+
+    def stats(self):
+        with self.lock:
+            last = self.hazard_history[-1] if self.hazard_history else None
+            return {"frames": self.frames,
+                    "idle_s": round(time.monotonic() - self.last_seen, 1),
+                    "tracks": {role: len(t.tracks) for role, t in self.trackers.items()},
+                    "threat_level": last[1] if last else None,
+                    "inference": self.cadence.stats(),
+                    "viewers": self.hub.viewers + self.raw_hub.viewers}
+
+
+class SessionStore:
+    def __init__(self, idle_s=SESSION_IDLE_S, max_sessions=MAX_SESSIONS):
+        self.idle_s = idle_s
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.last_device = None     # 가장 최근에 프레임을 보낸 기기
+        self.last_evict = 0.0
+        self.evicted = 0
+
+    def get(self, device_id=None):
+        # 프레임을 보낸 기기의 세션 (없으면 생성)
+        device_id = device_id or DEFAULT_DEVICE
+        session = self.sessions.get(device_id)
+        if session is None:
+            with self.lock:
+                session = self.sessions.get(device_id)
+                if session is None:
+                    session = self.sessions[device_id] = Session(device_id)
+                    self._evict_locked(time.monotonic(), keep=device_id)
+        session.touch()
+        self.last_device = device_id
+        if session.last_seen - self.last_evict > EVICT_INTERVAL_S:
+            self.evict_idle()
+        return session
+
+    def find(self, device_id=None):
+        # 조회 전용 (세션을 만들지 않음): device 미지정 시 가장 최근 기기
+        return self.sessions.get(device_id or self.last_device or DEFAULT_DEVICE)
+
+    def evict_idle(self):
+        with self.lock:
+            self._evict_locked(time.monotonic())
+
+    def _evict_locked(self, now, keep=None):
+        self.last_evict = now
+        candidates = {d: s for d, s in self.sessions.items() if d != keep and not s.watched()}
+        idle = [d for d, s in candidates.items() if now - s.last_seen > self.idle_s]
+        over = len(self.sessions) - len(idle) - self.max_sessions
+        if over > 0:
+            rest = sorted((s.last_seen, d) for d, s in candidates.items() if d not in idle)
+            idle += [d for _, d in rest[:over]]
+        for d in idle:
+            del self.sessions[d]
+        self.evicted += len(idle)
+
+    def stats(self):
+        sessions = list(self.sessions.items())
+        return {"count": len(sessions), "evicted": self.evicted,
+                "devices": {d: s.stats() for d, s in sessions}}
+
+
+def device_id_of(conn, device=None):
+    # HTTP/WebSocket 요청의 기기 id: ?device= → X-Device-Id 헤더 → 클라이언트 IP
+    if device:
+        return device
+    header = conn.headers.get("x-device-id")
+    if header:
+        return header
+    return conn.client.host if conn.client else None
+
+
+sessions = SessionStore()
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import cv2
+import numpy as np
+
+# -----------------------
+# MJPEG 브로드캐스트 허브
+#   새 프레임마다 품질 프로파일별로 JPEG 인코딩은 한 번만 하고
+#   같은 바이트를 모든 시청자에게 전달 (시퀀스 번호로 새 프레임 여부 판단)
+#   시청자는 asyncio 이벤트로 새 프레임이 들어올 때만 깨어남
+#   → 대기 중인 시청자는 스레드를 점유하지 않음 (수백 연결 가능)
+#   이미 JPEG 인 프레임(UDP 수신)은 publish_jpeg 로 그대로 전달하고,
+#   다른 프로파일로 재인코딩할 때만 디코딩
+#   publish_lazy 로 발행된 프레임(탐지 오버레이)은 시청자가 가져갈 때만 렌더링
+# -----------------------
+PROFILES = {
+    "full": {"quality": 70, "width": None},
+    "thumb": {"quality": 60, "width": 320},
+}
+RESOLVE_INTERVAL_S = 0.5    # 프레임이 없을 때 시청할 허브를 다시 확인하는 주기
+
+
+def encode_profile(frame, profile):
+    cfg = PROFILES[profile]
+    if cfg["width"] is not None and frame.shape[1] > cfg["width"]:
+        h = int(frame.shape[0] * cfg["width"] / frame.shape[1])
+        frame = cv2.resize(frame, (cfg["width"], h), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, cfg["quality"]])
+    return buffer.tobytes()
+
+
+class FrameHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.encode_lock = threading.Lock()
+        self.seq = 0
+        self.frame = None       # BGR (JPEG 로 발행된 경우 필요할 때 디코딩)
+        self.jpeg = None        # publish_jpeg 원본 바이트
+        self.render = None      # publish_lazy 렌더 함수와 인자
+        self.viewers = 0
+        self.encoded = {}       # profile -> 현재 seq 의 JPEG 바이트
+
+        self.loop = None        # 시청자가 있는 이벤트 루프
+        self.event = None       # 새 프레임 알림 (알릴 때마다 교체)
+
+    # ---------- 발행 (어느 스레드에서든 호출 가능) ----------
+    def publish(self, frame):
+        with self.lock:
+            self.frame = frame
+            self.jpeg = None
+            self.render = None
+            self.seq += 1
+            self.encoded = {}
+        self._notify()
+
+    def publish_jpeg(self, data, profile="full"):
+        # 디코딩/재인코딩 없이 받은 JPEG 를 해당 프로파일로 그대로 사용
+        with self.lock:
+            self.frame = None
+            self.jpeg = data
+            self.render = None
+            self.seq += 1
+            self.encoded = {profile: data}
+        self._notify()
+
+    def publish_lazy(self, render_fn, *args):
+        # 렌더링은 시청자가 이 프레임을 요청할 때 한 번만 수행
+        with self.lock:
+            self.frame = None
+            self.jpeg = None
+            self.render = (render_fn, args)
+            self.seq += 1
+            self.encoded = {}
+        self._notify()
+
+    def _pixels(self):
+        # 인코딩용 (seq, BGR): JPEG 는 디코딩, publish_lazy 는 오버레이 렌더링 (한 번만)
+        #   encode_lock 안에서만 호출 → 렌더 버퍼를 쓰는 동안 같은 허브의 다음 렌더링이 덮어쓰지 않음
+        with self.lock:
+            seq, frame, jpeg, render = self.seq, self.frame, self.jpeg, self.render
+        if frame is None and (jpeg is not None or render is not None):
+            if jpeg is not None:
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            else:
+                render_fn, args = render
+                frame = render_fn(*args)
+            with self.lock:
+                if self.seq == seq:
+                    self.frame = frame
+        return seq, frame
+
+    def _notify(self):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        event, self.event = self.event, asyncio.Event()
+        if event is not None:
+            event.set()
+
+    def _current_event(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.event = asyncio.Event()
+        return self.event
+
+    # ---------- 구독 ----------
+    def _encoded(self, seq, profile):
+        with self.encode_lock:
+            with self.lock:
+                if self.seq == seq and profile in self.encoded:
+                    return seq, self.encoded[profile]
+            seq, frame = self._pixels()
+            data = encode_profile(frame, profile)
+            with self.lock:
+                if self.seq == seq:
+                    self.encoded[profile] = data
+            return seq, data
+
+    async def next_frame(self, after_seq, profile="full", timeout=None):
+        # after_seq 이후의 새 프레임이 올 때까지 대기 → (seq, jpeg 바이트), timeout 초과 시 None
+        while self.seq <= after_seq:
+            try:
+                await asyncio.wait_for(self._current_event().wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        with self.lock:
+            seq, data = self.seq, self.encoded.get(profile)
+        if data is None:
+            seq, data = await asyncio.to_thread(self._encoded, seq, profile)
+        return seq, data
+
+
+def mjpeg_part(seq, data):
+    return (b"--frame\r\n"
+            b"Content-Type: image/jpeg\r\n"
+            b"X-Frame-Seq: " + str(seq).encode() + b"\r\n\r\n" + data + b"\r\n")
+
+
+async def gen_frames(resolve, profile="full", max_fps=None):
+    # resolve(): 보여줄 허브 (아직 없으면 None) → 연결 시 한 번 정하고,
+    #   허브가 없거나 RESOLVE_INTERVAL_S 동안 새 프레임이 없을 때만 다시 확인
+    #   (device 미지정 시 여러 기기가 번갈아 보내도 한 기기의 스트림에 머묾)
+    # max_fps: 시청자 표시 속도 (렌더링/인코딩도 이 속도를 넘지 않음)
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / max_fps if max_fps else 0.0
+    hub, seq, stale = None, 0, True
+    try:
+        while True:
+            started = loop.time()
+            if stale:
+                current = resolve()
+                if current is not hub:
+                    if hub is not None:
+                        hub.viewers -= 1
+                    hub, seq = current, 0
+                    if hub is not None:
+                        hub.viewers += 1
+            if hub is None:
+                await asyncio.sleep(RESOLVE_INTERVAL_S)
+                continue
+            frame = await hub.next_frame(seq, profile, timeout=RESOLVE_INTERVAL_S)
+            stale = frame is None
+            if stale:
+                continue
+            seq, data = frame
+            yield mjpeg_part(seq, data)
+            remaining = interval - (loop.time() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+    finally:
+        if hub is not None:
+            hub.viewers -= 1
@@ -1,14 +1,18 @@
 import whisper
-import aiofiles
+from service.executor import get_engine, BACKGROUND
 
 stt_model = whisper.load_model("base")
+whisper_engine = get_engine("whisper", workers=1, max_queue=4, priority=BACKGROUND)
 
-async def transcribe(audio_file):
-    # 임시 파일 저장
-    async with aiofiles.open("temp.wav", "wb") as out:
-        content = await audio_file.read()
-        await out.write(content)
+def _transcribe_sync(content):
+    # 임시 파일 저장 (단일 워커라 temp.wav 를 순차적으로 사용)
+    with open("temp.wav", "wb") as out:
+        out.write(content)
 
     # STT 실행
     result = stt_model.transcribe("temp.wav")
     return result["text"]
+
+async def transcribe(audio_file):
+    content = await audio_file.read()
+    return await whisper_engine.run(_transcribe_sync, content)
@@ -0,0 +1,146 @@
+import itertools
+import threading
+from collections import deque
+import numpy as np
+
+# -----------------------
+# 다중 객체 추적기 (ByteTrack 방식 단순화)
+#   - IoU 기반 연관: 높은 신뢰도 박스 먼저, 남은 트랙에 낮은 신뢰도 박스 연결
+#   - 트랙 id 는 프레임 내 박스 순서와 무관하게 유지
+#   - TTL 동안 안 보인 트랙은 제거, 트랙 수 상한으로 메모리 제한
+#   - 트랙별 속도(px/s)와 깊이 이력으로 충돌 예상 시간(TTC) 계산
+# -----------------------
+TRACK_TTL_S = 1.0
+MAX_TRACKS = 200
+MAX_HISTORY = 10
+IOU_MATCH = 0.3
+HIGH_CONF = 0.5
+MIN_CLOSING_MPS = 0.1   # 이보다 느리게 다가오면 TTC 없음
+
+_next_id = itertools.count(1)
+
+
+def iou_matrix(a, b):
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(rb - lt, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def greedy_match(iou, thresh):
+    # IoU 큰 쌍부터 1:1 매칭 → [(row, col), ...]
+    rows, cols = np.nonzero(iou >= thresh)
+    order = np.argsort(-iou[rows, cols])
+    used_r, used_c, matches = set(), set(), []
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r)
+        used_c.add(c)
+        matches.append((r, c))
+    return matches
+
+
+class Track:
+    __slots__ = ("id", "cls", "box", "last_seen", "hits", "history", "velocity", "ttc")
+
+    def __init__(self, box, cls, depth_m, now):
+        self.id = next(_next_id)
+        self.cls = cls
+        self.box = box
+        self.last_seen = now
+        self.hits = 1
+        self.history = deque(maxlen=MAX_HISTORY)   # (t, cx, cy, depth_m)
+        self.velocity = (0.0, 0.0)
+        self.ttc = None
+        self._append(box, depth_m, now)
+
+    def _append(self, box, depth_m, now):
+        self.history.append((now, float(box[0] + box[2]) / 2, float(box[3]), depth_m))
+
+    def predict(self, now):
+        dt = now - self.last_seen
+        vx, vy = self.velocity
+        return self.box + np.array([vx, vy, vx, vy]) * dt
+
+    def update(self, box, depth_m, now):
+        self.box = box
+        self.last_seen = now
+        self.hits += 1
+        self._append(box, depth_m, now)
+
+        (t0, x0, y0, _), (t1, x1, y1, d1) = self.history[0], self.history[-1]
+        dt = t1 - t0
+        if dt > 0:
+            self.velocity = ((x1 - x0) / dt, (y1 - y0) / dt)
+
+        # 유효 깊이 이력으로 접근 속도 → TTC
+        depths = [(t, d) for t, _, _, d in self.history if d > 0]
+        self.ttc = None
+        if len(depths) >= 2 and d1 > 0:
+            (ta, da), (tb, db) = depths[0], depths[-1]
+            if tb > ta:
+                closing = (da - db) / (tb - ta)
+                if closing > MIN_CLOSING_MPS:
+                    self.ttc = db / closing
+
+
+class Tracker:
+    def __init__(self, ttl=TRACK_TTL_S, max_tracks=MAX_TRACKS, iou_thresh=IOU_MATCH, high_conf=HIGH_CONF):
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.iou_thresh = iou_thresh
+        self.high_conf = high_conf
+        self.tracks = []
+        self.lock = threading.Lock()
+
+    def _associate(self, tracks, boxes, cls, det_idx, now):
+        if not tracks or len(det_idx) == 0:
+            return [], list(range(len(tracks))), list(det_idx)
+        predicted = np.stack([t.predict(now) for t in tracks])
+        iou = iou_matrix(predicted, boxes[det_idx])
+        track_cls = np.array([t.cls for t in tracks])
+        iou[track_cls[:, None] != cls[det_idx][None, :]] = 0.0   # 같은 클래스끼리만
+        matches = greedy_match(iou, self.iou_thresh)
+        matched_t = {r for r, _ in matches}
+        matched_d = {c for _, c in matches}
+        return ([(r, det_idx[c]) for r, c in matches],
+                [r for r in range(len(tracks)) if r not in matched_t],
+                [det_idx[c] for c in range(len(det_idx)) if c not in matched_d])
+
+    def update(self, boxes, cls, conf, depth_m, now):
+        # boxes (N,4) / cls (N,) / conf (N,) / depth_m (N,) → 박스별 트랙 (없으면 None)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        out = [None] * len(boxes)
+        with self.lock:
+            self.tracks = [t for t in self.tracks if now - t.last_seen <= self.ttl]
+
+            high = np.flatnonzero(conf >= self.high_conf)
+            low = np.flatnonzero(conf < self.high_conf)
+
+            # 1단계: 높은 신뢰도 박스 ↔ 전체 트랙
+            matches, rest_t, new_d = self._associate(self.tracks, boxes, cls, high, now)
+            # 2단계: 낮은 신뢰도 박스 ↔ 남은 트랙 (가려짐 등으로 신뢰도가 떨어진 객체 유지)
+            rest_tracks = [self.tracks[i] for i in rest_t]
+            low_matches, _, _ = self._associate(rest_tracks, boxes, cls, low, now)
+
+            for ti, di in matches:
+                self.tracks[ti].update(boxes[di], float(depth_m[di]), now)
+                out[di] = self.tracks[ti]
+            for ti, di in low_matches:
+                rest_tracks[ti].update(boxes[di], float(depth_m[di]), now)
+                out[di] = rest_tracks[ti]
+
+            # 매칭 안 된 높은 신뢰도 박스 → 새 트랙
+            for di in new_d:
+                track = Track(boxes[di], int(cls[di]), float(depth_m[di]), now)
+                self.tracks.append(track)
+                out[di] = track
+
+            if len(self.tracks) > self.max_tracks:
+                self.tracks.sort(key=lambda t: t.last_seen, reverse=True)
+                del self.tracks[self.max_tracks:]
+        return out
@@ -1,10 +1,16 @@
 from gtts import gTTS
 import uuid
+from service.executor import get_engine, BACKGROUND
 
-async def speak(text: str) -> str:
+tts_engine = get_engine("tts", workers=1, max_queue=4, priority=BACKGROUND)
+
+def _speak_sync(text: str) -> str:
     filename = "answer.mp3"
     print("TTS 시작")
     tts = gTTS(text=text, lang="ko")
     tts.save(filename)
     print("TTS 파일 저장완료", filename)
     return filename
+
+async def speak(text: str) -> str:
+    return await tts_engine.run(_speak_sync, text)
@@ -0,0 +1,130 @@
+import asyncio
+import socket
+import time
+from collections import OrderedDict
+from protocol import udp_proto, frame_codec
+from service.executor import EngineBusy
+from service.session import sessions
+
+# -----------------------
+# UDP 프레임 수신 (asyncio DatagramProtocol, 이벤트 루프에서 직접 수신)
+#   - BU 프로토콜: 조각 재조립 후 기기(device_id)별 채널에 발행
+#   - 헤더 없는 JPEG datagram (이전 클라이언트): 보낸 IP 를 기기 id 로 사용
+#   - KIND_FRAME (color + depth): detect_fn 이 있으면 바로 위험 탐지 후
+#     위험 응답 패킷을 보낸 주소로 UDP 회신 (HTTP 왕복 없음, 기기별 최신 프레임 우선)
+#   기기별 채널은 세션(service/session.py)의 raw_hub
+# -----------------------
+UDP_RCVBUF = 4 * 1024 * 1024    # 여러 대의 720p 30fps 카메라 버스트 수용
+MAX_DEVICES = 64                # 재조립 / 탐지 슬롯을 유지할 최대 기기 수 (device_id 는 검증되지 않은 값)
+DETECT_SLOT_IDLE_S = 30.0       # 이 시간 동안 프레임이 없는 기기의 탐지 태스크 종료
+
+
+def find_channel(device_id=None):
+    session = sessions.find(device_id)
+    return session.raw_hub if session is not None else None
+
+
+def publish_jpeg(device_id, data):
+    sessions.get(device_id).raw_hub.publish_jpeg(data)
+
+
+class _DetectSlot:
+    def __init__(self):
+        self.pending = None     # (payload, addr) 최신 프레임 하나만 유지
+        self.event = asyncio.Event()
+        self.task = None
+        self.last_seen = time.monotonic()
+
+
+class UdpIngestProtocol(asyncio.DatagramProtocol):
+    def __init__(self, detect_fn=None):
+        self.reassembler = udp_proto.Reassembler(max_devices=MAX_DEVICES)
+        self.transport = None
+        self.detect_fn = detect_fn      # async (BHCF bytes, device_id) -> (detections, states, threat_level)
+        self.slots = OrderedDict()      # device_id -> _DetectSlot, 최근 기기가 뒤쪽
+        self.dropped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+
+    def datagram_received(self, data, addr):
+        if data[:2] == b"\xff\xd8":
+            publish_jpeg(addr[0], data)
+            return
+        frame = self.reassembler.add(data)
+        if frame is None:
+            return
+        device_id, frame_id, kind, timestamp, payload = frame
+        if kind == udp_proto.KIND_JPEG:
+            publish_jpeg(device_id, payload)
+        elif kind == udp_proto.KIND_FRAME:
+            # 시청용 JPEG 는 헤더만 읽고 잘라냄 (depth 복원은 탐지 경로에서 한 번만)
+            try:
+                h = frame_codec.read_header(payload)
+            except ValueError:
+                return
+            color_end = h.header_size + h.color_len
+            if len(payload) < color_end + h.depth_len:
+                return
+            publish_jpeg(device_id, bytes(payload[h.header_size:color_end]))
+            if self.detect_fn is not None:
+                self._submit_detect(device_id, payload, addr)
+
+    # ---------- UDP 위험 탐지 경로 ----------
+    def _submit_detect(self, device_id, payload, addr):
+        now = time.monotonic()
+        slot = self.slots.get(device_id)
+        if slot is None:
+            self._evict_slots(now)
+            slot = self.slots[device_id] = _DetectSlot()
+            slot.task = asyncio.get_running_loop().create_task(self._detect_loop(slot, device_id))
+        else:
+            self.slots.move_to_end(device_id)
+        slot.last_seen = now
+        if slot.pending is not None:
+            self.dropped += 1   # 탐지 중에 더 새 프레임 도착 → 이전 프레임 폐기
+        slot.pending = (payload, addr)
+        slot.event.set()
+
+    def _evict_slots(self, now):
+        # 오래 조용한 기기 + 상한 초과분(가장 오래된 기기)의 탐지 태스크 종료
+        for device_id in [d for d, s in self.slots.items() if now - s.last_seen > DETECT_SLOT_IDLE_S]:
+            self.slots.pop(device_id).task.cancel()
+        while len(self.slots) >= MAX_DEVICES:
+            _, slot = self.slots.popitem(last=False)
+            slot.task.cancel()
+
+    async def _detect_loop(self, slot, device_id):
+        while True:
+            await slot.event.wait()
+            slot.event.clear()
+            payload, addr = slot.pending
+            slot.pending = None
+            try:
+                header = frame_codec.read_header(payload)
+                detections, states, threat_level = await self.detect_fn(payload, device_id)
+            except (ValueError, EngineBusy):
+                continue
+            except Exception as e:
+                print("❌ UDP 탐지 에러:", e)
+                continue
+            if self.transport is not None:
+                self.transport.sendto(
+                    udp_proto.pack_hazard(header.frame_id, header.timestamp, threat_level, states), addr)
+
+    def stats(self):
+        return {"devices": list(sessions.sessions), "completed": self.reassembler.completed,
+                "expired": self.reassembler.expired,
+                "evicted_devices": self.reassembler.evicted_devices,
+                "detect_slots": len(self.slots), "detect_dropped": self.dropped}
+
+
+async def start(host, port, detect_fn=None):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: UdpIngestProtocol(detect_fn), local_addr=(host, port))
+    print(f"✅ UDP 프레임 수신 서버 실행 (포트 {port})")
+    return transport, protocol
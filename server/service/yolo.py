@@ -1,27 +1,34 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
-import io
-from api import route_stream
+from service.executor import get_engine
+from service.yolo_backend import load_model
+from service.session import sessions
 
-model = YOLO("yolov8n.pt")  # 서버 GPU에서 로드
+model = load_model("yolov8n.pt")  # 서버 GPU에서 로드
+yolo_engine = get_engine("yolo_annotate")
 
-async def detect(image_file):
-    # 파일 읽기
-    image_bytes = await image_file.read()
+def _detect_sync(image_bytes, session):
     nparr = np.frombuffer(image_bytes, np.uint8)
     img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
     # YOLO 추론
     results = model(img, verbose=False)
 
-    # 시각화된 프레임 얻기
-    annotated = results[0].plot()
+    # 시각화는 /stream 시청자가 프레임을 가져갈 때만 (detect 응답에는 annotated 이미지 없음)
+    session.hub.publish_lazy(results[0].plot)
 
-    # JPEG 인코딩
-    success, buffer = cv2.imencode(".jpg", annotated)
-    route_stream.last_frame = buffer.copy()
-    if not success:
-        raise RuntimeError("YOLO 이미지 인코딩 실패")
+    # 탐지 결과 리스트 (박스 좌표 → 클라이언트가 직접 그림)
+    boxes = results[0].boxes
+    xyxy = boxes.xyxy.cpu().numpy().astype(int).tolist()
+    cls_ids = boxes.cls.cpu().numpy().astype(int).tolist()
+    confs = boxes.conf.cpu().numpy().round(3).tolist()
+    return [{
+        "class": model.names[cls_id],
+        "confidence": conf,
+        "bbox": box
+    } for box, cls_id, conf in zip(xyxy, cls_ids, confs)]
 
-    return buffer.tobytes()
\ No newline at end of file
+async def detect(image_file, device_id=None):
+    # 파일 읽기
+    image_bytes = await image_file.read()
+    return await yolo_engine.run(_detect_sync, image_bytes, sessions.get(device_id))
@@ -1,36 +1,34 @@
-from ultralytics import YOLO
-import cv2, numpy as np, base64
+import cv2, numpy as np
+from service.executor import get_engine
+from service.yolo_backend import load_model
 
-model = YOLO("yolov8n.pt")
+model = load_model("yolov8n.pt")
+yolo_engine = get_engine("yolo_sig")
 
-async def detect(image_file):
-    # 파일 읽기
-    image_bytes = await image_file.read()
+def _detect_sync(image_bytes):
     nparr = np.frombuffer(image_bytes, np.uint8)
     img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
     # YOLO 추론
     results = model(img, verbose=False)
 
-    # annotated 이미지
-    annotated = results[0].plot()
-    success, buffer = cv2.imencode(".jpg", annotated)
-    if not success:
-        raise RuntimeError("YOLO 이미지 인코딩 실패")
-
-    annotated_base64 = base64.b64encode(buffer).decode("utf-8")
-
-    # 탐지 결과 리스트
-    detections = []
-    for box in results[0].boxes:
-        cls_id = int(box.cls[0])
-        conf = float(box.conf[0])
-        detections.append({
-            "class": model.names[cls_id],
-            "confidence": conf
-        })
+    # 탐지 결과 리스트 (annotated 이미지 대신 박스 좌표 → 클라이언트가 직접 그림)
+    boxes = results[0].boxes
+    xyxy = boxes.xyxy.cpu().numpy().astype(int).tolist()
+    cls_ids = boxes.cls.cpu().numpy().astype(int).tolist()
+    confs = boxes.conf.cpu().numpy().round(3).tolist()
+    detections = [{
+        "class": model.names[cls_id],
+        "confidence": conf,
+        "bbox": box
+    } for box, cls_id, conf in zip(xyxy, cls_ids, confs)]
 
     # 위협 수준 간단 로직 (예시)
     threat_level = "high" if any(d["class"] in ["person", "cup"] for d in detections) else "low"
 
-    return annotated_base64, detections, threat_level
+    return detections, threat_level
+
+async def detect(image_file):
+    # 파일 읽기
+    image_bytes = await image_file.read()
+    return await yolo_engine.run(_detect_sync, image_bytes)
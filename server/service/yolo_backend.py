@@ -0,0 +1,57 @@
+import hashlib
+import os
+import shutil
+from ultralytics import YOLO
+
+# -----------------------
+# YOLO 추론 백엔드 선택 (GPU 없는 서버용)
+#   torch    : .pt 그대로 (eager PyTorch)
+#   onnx     : ONNX Runtime
+#   openvino : OpenVINO IR
+#   변환 결과는 EXPORT_DIR 에 가중치 해시로 저장 → 가중치가 바뀔 때만 다시 변환
+#   변환/로드 실패 시 torch 로 실행
+# -----------------------
+YOLO_BACKEND = "torch"
+EXPORT_DIR = "./exported_models"
+
+EXPORT_FORMATS = {
+    "onnx": (".onnx", ".onnx"),                         # (ultralytics 출력 접미사, 캐시 이름 접미사)
+    "openvino": ("_openvino_model", "_openvino_model"),
+}
+
+
+def weight_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def export_path(path, backend):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(EXPORT_DIR, f"{stem}-{weight_hash(path)}{EXPORT_FORMATS[backend][1]}")
+
+
+def export(path, backend):
+    target = export_path(path, backend)
+    if not os.path.exists(target):
+        # dynamic: 배치 크기 / ROI crop 입력 크기가 프레임마다 달라도 재변환 없이 사용
+        exported = YOLO(path).export(format=backend, dynamic=True)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        shutil.move(exported, target)
+        print(f"✅ {path} → {target}")
+    return target
+
+
+def load_model(path, backend=None):
+    backend = backend or YOLO_BACKEND
+    if backend == "torch":
+        return YOLO(path)
+    if backend not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 YOLO 백엔드: {backend}")
+    try:
+        return YOLO(export(path, backend), task="detect")
+    except Exception as e:
+        print(f"❌ {backend} 백엔드 로드 실패, torch 로 실행:", e)
+        return YOLO(path)
@@ -1,8 +1,15 @@
-from ultralytics import YOLO
+import asyncio
+import os
+import time
 import cv2
 import numpy as np
-from collections import deque
-from api import route_stream
+from service.batcher import MicroBatcher
+from service.executor import get_engine, scheduler
+from service import hazard
+from service.depth import sample_depth
+from service.session import sessions
+from service.yolo_backend import load_model
+from protocol import frame_codec
 
 # -----------------------
 # 모델 로드
@@ -12,7 +19,24 @@ model_paths = {
     "Static": "Obstacle_detect.pt",
     "Surface": "Surface_detect.pt"
 }
-models = {name: YOLO(path) for name, path in model_paths.items()}
+
+# 같은 가중치 파일은 한 번만 로드 (Dynamic/Static 은 Obstacle_detect.pt 공유)
+# 백엔드(torch / onnx / openvino)는 service/yolo_backend.py 의 YOLO_BACKEND
+weight_models = {path: load_model(path) for path in dict.fromkeys(model_paths.values())}
+models = {name: weight_models[path] for name, path in model_paths.items()}
+
+# -----------------------
+# 역할별 실행 주기 (n 프레임마다 추론, 사이 프레임은 캐시 결과 사용: service/cadence.py)
+#   정적 장애물 / 노면은 보행 속도에 비해 천천히 변함, 동적 객체는 매 프레임
+#   가중치를 공유하는 역할은 한 번의 추론을 같이 쓰므로 가장 짧은 주기를 따름
+#   (Static 은 Dynamic 과 Obstacle_detect.pt 를 공유 → 따로 주기를 두지 않고 매 프레임)
+# -----------------------
+MODEL_CADENCE = {
+    "Dynamic": 1,
+    "Surface": 2,
+}
+weight_cadence = {path: min(MODEL_CADENCE.get(name, 1) for name, p in model_paths.items() if p == path)
+                  for path in weight_models}
 
 # -----------------------
 # 허용 클래스 정의
@@ -24,211 +48,268 @@ static_ground_allowed = {"tree_trunk", "fire_hydrant", "stop",
 static_head_allowed = {"traffic_light"}
 surface_ground_allowed = {"caution_zone"}
 
-# -----------------------
-# ROI 함수
-# -----------------------
-def get_ground_roi(W, H):
-    bottom_width = 0.7
-    top_width = 0.3
-    cx = W // 2
-    cy_bottom = H
-    cy_top = int(H * 0.7)
+# 역할(role)별로 공유 추론 결과에서 걸러낼 클래스
+role_classes = {
+    "Dynamic": allowed_dynamic,
+    "Static": static_ground_allowed | static_head_allowed,
+    "Surface": surface_ground_allowed,
+}
+
+# 역할별 위험 판정 규칙: (클래스, 기준점)
+#   ground: (cx, ref_y) 가 하단 좌/우 영역 안
+#   head  : (cx, y1) 가 상단 영역 안
+hazard_rules = {
+    "Dynamic": [(allowed_dynamic, "ground")],
+    "Static": [(static_head_allowed, "head"), (static_ground_allowed, "ground")],
+    "Surface": [(surface_ground_allowed, "ground")],
+}
 
-    bl = (int(cx - W * bottom_width / 2), cy_bottom)
-    br = (int(cx + W * bottom_width / 2), cy_bottom)
-    tr = (int(cx + W * top_width / 2), cy_top)
-    tl = (int(cx - W * top_width / 2), cy_top)
+# 가중치별 판정 기준점 → ROI crop 추론 (hazard.get_crop)
+#   Surface 는 하단 영역만, Obstacle 은 상단+하단이라 전체 프레임
+ROI_CROP = True
+weight_points = {path: tuple(sorted({point for name, p in model_paths.items() if p == path
+                                     for _, point in hazard_rules[name]}))
+                 for path in weight_models}
 
-    roi = np.array([[bl, br, tr, tl]], dtype=np.int32)
-    left_poly = np.array([[bl, (cx, cy_bottom), (cx, cy_top), tl]], dtype=np.int32)
-    right_poly = np.array([[(cx, cy_bottom), br, tr, (cx, cy_top)]], dtype=np.int32)
+def crop_of(path, W, H):
+    return hazard.get_crop(W, H, weight_points[path]) if ROI_CROP else None
 
-    return roi, left_poly, right_poly, cy_top
+def class_ids(names, labels):
+    return np.array([i for i, n in names.items() if n in labels], dtype=np.int64)
 
-def get_head_roi(W, H, top_width_ratio=0.8, bottom_width_ratio=0.4):
-    top_y = 0
-    bottom_y = int(H * 0.25)
-    cx = W // 2
-    top_half = int(W * top_width_ratio / 2)
-    bottom_half = int(W * bottom_width_ratio / 2)
+# 클래스 이름 → 모델 클래스 id (프레임마다 문자열 비교하지 않도록 미리 계산)
+role_class_ids = {name: class_ids(models[name].names, labels) for name, labels in role_classes.items()}
+rule_class_ids = {name: [(class_ids(models[name].names, labels), point) for labels, point in rules]
+                  for name, rules in hazard_rules.items()}
 
-    roi_points = np.array([[
-        (cx - top_half, top_y),
-        (cx + top_half, top_y),
-        (cx + bottom_half, bottom_y),
-        (cx - bottom_half, bottom_y)
-    ]], dtype=np.int32)
+# -----------------------
+# 가중치별 추론 프로파일 (모델 호출 인자로 그대로 전달)
+#   imgsz / conf / max_det 는 bench/sweep_profiles.py 결과로 조정
+#   imgsz 미지정 시 모델 학습 imgsz (기존 model(img) 호출과 같은 입력 크기)
+#   classes 는 역할들이 쓰는 클래스만 → NMS 전에 나머지 클래스 제거
+#   conf 는 추적기 2단계 연관용 낮은 신뢰도 박스까지 받음 (tracker.HIGH_CONF 미만)
+#   위험 판정 / 응답 detections 는 HAZARD_CONF 이상 박스만
+# -----------------------
+MODEL_PROFILES = {
+    "Obstacle_detect.pt": {"conf": 0.25, "max_det": 100},
+    "Surface_detect.pt": {"conf": 0.25, "max_det": 20},
+}
+HAZARD_CONF = 0.5
+DEFAULT_IMGSZ = 640     # 학습 imgsz 를 알 수 없을 때 (ultralytics 기본값)
 
-    return roi_points
+def train_imgsz(model):
+    # .pt 체크포인트의 학습 imgsz (정수 또는 [h, w])
+    imgsz = model.overrides.get("imgsz") or DEFAULT_IMGSZ
+    return max(imgsz) if isinstance(imgsz, (list, tuple)) else int(imgsz)
+
+weight_classes = {path: sorted({int(i) for name, p in model_paths.items() if p == path
+                                for i in role_class_ids[name]})
+                  for path in weight_models}
+infer_args = {path: dict({"imgsz": train_imgsz(model)}, **MODEL_PROFILES.get(path, {}),
+                         classes=weight_classes[path])
+              for path, model in weight_models.items()}
 
 # -----------------------
-# 궤적 추적 버퍼
+# 공유 추론: 고유 가중치마다 프레임당 1회만 실행
+# 여러 클라이언트의 프레임은 BATCH_WINDOW_MS 동안 모아 배치 추론
 # -----------------------
-trajectory_buffer = {}
-max_history = 5
+BATCH_WINDOW_MS = 8
+BATCH_MAX = 8
 
-def update_trajectory(obj_id, cx, cy):
-    from collections import deque
-    if obj_id not in trajectory_buffer:
-        trajectory_buffer[obj_id] = deque(maxlen=max_history)
-    trajectory_buffer[obj_id].append((cx, cy))
-    if len(trajectory_buffer[obj_id]) >= 2:
-        (x1, y1), (x2, y2) = trajectory_buffer[obj_id][-2], trajectory_buffer[obj_id][-1]
-        return x2 - x1, y2 - y1
-    return 0, 0
+def _batch_infer(model, args):
+    return lambda imgs: model(imgs, **args)
 
 # -----------------------
-# YOLO 처리 함수
+# 모델 실행 워커
+#   기본: 모든 가중치가 워커 1개를 공유 → 한 프레임의 Obstacle / Surface 를 차례로,
+#     각각 전체 torch 스레드로 실행 (동시에 돌리면 기본 스레드 수끼리 코어를 나눠 가짐)
+#   PARALLEL_MODELS = True: 가중치마다 전용 워커 1개로 동시에 실행 (추론 중 GIL 해제)
+#     → bench/bench_parallel_models.py 로 배포 장비에서 이득이 확인될 때만 사용
+#   torch 스레드 수는 프로세스 전체 설정이라 워커별로 나누지 않음
+#     (나누면 Surface 를 건너뛰는 프레임의 Obstacle 추론과 BLIP/Whisper 까지 코어 일부만 씀)
 # -----------------------
-async def detect(color_file, depth_file):
-    # 이미지 복원
-    color_bytes = await color_file.read()
-    color_arr = np.frombuffer(color_bytes, np.uint8)
-    color_img = cv2.imdecode(color_arr, cv2.IMREAD_COLOR)
+PARALLEL_MODELS = False
 
-    depth_bytes = await depth_file.read()
-    depth_arr = np.frombuffer(depth_bytes, np.uint8)
-    depth_img = cv2.imdecode(depth_arr, cv2.IMREAD_UNCHANGED)  # uint16 깊이
+if PARALLEL_MODELS:
+    yolo_engines = {path: get_engine(f"yolo:{os.path.basename(path)}", workers=1)
+                    for path in weight_models}
+else:
+    yolo_engines = dict.fromkeys(weight_models, get_engine("yolo:pipeline", workers=1))
+frame_engine = get_engine("frame", workers=2, max_queue=32)   # 디코딩 / 위험 판정 / 시각화
 
-    H, W = color_img.shape[:2]
+batchers = {path: MicroBatcher(_batch_infer(model, infer_args[path]), BATCH_WINDOW_MS, BATCH_MAX, yolo_engines[path])
+            for path, model in weight_models.items()}
 
-    # ROI 계산
-    ground_roi, ground_left, ground_right, horizon_y = get_ground_roi(W, H)
-    head_roi = get_head_roi(W, H)
+def model_input(path, color_img):
+    # crop 영역만 잘라서 추론 (numpy view, 복사 없음) → 박스는 classify 에서 원래 좌표로 복원
+    H, W = color_img.shape[:2]
+    crop = crop_of(path, W, H)
+    if crop is None:
+        return color_img
+    x1, y1, x2, y2 = crop
+    return color_img[y1:y2, x1:x2]
 
-    ground_left_state = "safe"
-    ground_right_state = "safe"
-    head_state = "safe"
+async def run_inference(color_img, paths=None):
+    paths = list(batchers) if paths is None else paths
+    results = await asyncio.gather(*(batchers[path].submit(model_input(path, color_img)) for path in paths))
+    return dict(zip(paths, results))
 
-    detections = []
+# -----------------------
+# 축소 복원: 모든 모델 입력(crop 후 imgsz)이 1/n 해상도로 충분하고
+# 오버레이 스트림 시청자가 없으면 JPEG 를 1/n 로 바로 디코딩 (n = 2, 4, 8)
+#   깊이 / 영역 판정은 원래 해상도, 박스는 classify 에서 n 배로 복원
+# -----------------------
+REDUCED_DECODE = True
+
+def decode_scale(W, H, session):
+    if not REDUCED_DECODE or session.hub.viewers:
+        return 1
+    need = 0.0
+    for path in weight_models:
+        crop = crop_of(path, W, H)
+        x1, y1, x2, y2 = crop if crop is not None else (0, 0, W, H)
+        need = max(need, infer_args[path]["imgsz"] / max(x2 - x1, y2 - y1))
+    for n in (8, 4, 2):
+        if need * n <= 1.0:
+            return n
+    return 1
 
-    # 여러 모델 순차 적용
-    for model_name, model in models.items():
-        results = model(color_img, conf=0.5)
-        names = model.names
+# -----------------------
+# 이미지 복원 (decode 엔진에서 실행) → color, depth, 축소 배율
+# -----------------------
+def decode_frames(session, color_bytes, depth_bytes):
+    depth_arr = np.frombuffer(depth_bytes, np.uint8)
+    depth_img = cv2.imdecode(depth_arr, cv2.IMREAD_UNCHANGED)  # uint16 깊이
 
-        for i, box in enumerate(results[0].boxes):
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cls = int(box.cls[0])
-            label = names[cls]
+    scale = decode_scale(depth_img.shape[1], depth_img.shape[0], session)
+    color_arr = np.frombuffer(color_bytes, np.uint8)
+    color_img = cv2.imdecode(color_arr, frame_codec.REDUCED_FLAGS[scale])
+    return color_img, depth_img, scale
 
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-            ref_y = int(y2 - (y2 - y1) * 0.125)
+def decode_container(session, buf):
+    # BHCF 컨테이너: depth 는 np.frombuffer 로 복사 없이 읽음
+    frame = frame_codec.decode_frame(buf)
+    scale = decode_scale(frame.depth.shape[1], frame.depth.shape[0], session)
+    return frame_codec.decode_color(frame, scale), frame.depth, scale
 
-            if ref_y < 0 or ref_y >= depth_img.shape[0] or cx < 0 or cx >= depth_img.shape[1]:
-                continue
+def prepare(session, decode_fn, *args):
+    # 복원 + 이번 프레임에 다시 추론할 가중치 결정
+    color_img, depth_img, scale = decode_fn(session, *args)
+    return color_img, depth_img, scale, session.cadence.plan(color_img, weight_cadence)
 
-            depth_val = depth_img[ref_y, cx]
-            depth_m = float(depth_val) / 1000.0 if depth_val > 0 else -1.0
+# -----------------------
+# 위험 판정: 프레임의 모든 박스를 NumPy 로 한 번에 분류
+# 객체 추적: 기기 세션마다, 역할마다 추적기 1개 (Surface 는 다른 모델이라 클래스 id 가 겹침)
+# -----------------------
+def classify(shared_results, depth_img, W, H, session, scale=1):
+    # W, H: 모델 입력(복원된 color) 크기, scale: 원래 해상도 / 복원 해상도
+    zone_map = hazard.get_zone_map(W * scale, H * scale)
+    now = time.monotonic()
+    depth_h, depth_w = depth_img.shape[:2]
 
+    detections = []
+    zones, sevs = [], []
+
+    for model_name, path in model_paths.items():
+        result = shared_results[path]
+        names = result.names
+        xyxy = result.boxes.xyxy.cpu().numpy().astype(np.int32)
+        crop = crop_of(path, W, H)
+        if crop is not None:
+            xyxy += np.array([crop[0], crop[1], crop[0], crop[1]], dtype=np.int32)
+        if scale != 1:
+            xyxy *= scale
+        cls = result.boxes.cls.cpu().numpy().astype(np.int64)
+        conf = result.boxes.conf.cpu().numpy()
+
+        cx, ref_y, top_y = hazard.ref_points(xyxy)
+        keep = np.isin(cls, role_class_ids[model_name])
+        keep &= (ref_y >= 0) & (ref_y < depth_h) & (cx >= 0) & (cx < depth_w)
+        idx = np.flatnonzero(keep)
+        if len(idx) == 0:
+            continue
+        xyxy, cls, conf, cx, ref_y, top_y = xyxy[idx], cls[idx], conf[idx], cx[idx], ref_y[idx], top_y[idx]
+
+        depth_m = sample_depth(depth_img, cx, ref_y)
+        tracks = session.tracker(model_name).update(xyxy, cls, conf, depth_m, now)
+
+        # 낮은 신뢰도 박스는 기존 트랙 유지에만 사용
+        sure = np.flatnonzero(conf >= HAZARD_CONF)
+        if len(sure) == 0:
+            continue
+        xyxy, cls, cx, ref_y, top_y, depth_m = xyxy[sure], cls[sure], cx[sure], ref_y[sure], top_y[sure], depth_m[sure]
+        tracks = [tracks[i] for i in sure.tolist()]
+        sev = hazard.severity(depth_m)
+
+        points = {
+            "ground": (hazard.lookup_zones(zone_map, cx, ref_y), hazard.GROUND_ZONES),
+            "head": (hazard.lookup_zones(zone_map, cx, top_y), hazard.HEAD_ZONES),
+        }
+        det_zone = np.full(len(sure), hazard.ZONE_NONE, dtype=np.uint8)
+        for ids, point in rule_class_ids[model_name]:
+            z, allowed_zones = points[point]
+            hit = np.isin(cls, ids) & np.isin(z, allowed_zones)
+            zones.append(z[hit])
+            sevs.append(sev[hit])
+            det_zone = np.where(hit & (det_zone == hazard.ZONE_NONE), z, det_zone)
+
+        # 클라이언트/GUI 가 직접 그릴 수 있도록 박스 좌표와 판정 영역 포함
+        for box, c, d, z, t in zip(xyxy.tolist(), cls.tolist(), depth_m.tolist(), det_zone.tolist(), tracks):
             detections.append({
                 "model": model_name,
-                "class": label,
-                "depth_m": depth_m
+                "class": names[c],
+                "depth_m": d,
+                "bbox": box,
+                "zone": hazard.ZONE_NAMES[z],
+                "track_id": t.id if t else None,
+                "velocity": [round(v, 1) for v in t.velocity] if t else None,   # px/s
+                "ttc_s": round(t.ttc, 2) if t and t.ttc is not None else None   # 충돌 예상 시간
             })
 
-            # -------------------
-            # Dynamic 처리
-            # -------------------
-            if model_name == "Dynamic":
-                if label not in allowed_dynamic:
-                    continue
-                if cv2.pointPolygonTest(ground_left[0], (cx, ref_y), False) >= 0:
-                    if 0 < depth_m <= 2.0:
-                        ground_left_state = "warning"
-                    elif 2.0 < depth_m <= 3.0:
-                        ground_left_state = "caution"
-                elif cv2.pointPolygonTest(ground_right[0], (cx, ref_y), False) >= 0:
-                    if 0 < depth_m <= 2.0:
-                        ground_right_state = "warning"
-                    elif 2.0 < depth_m <= 3.0:
-                        ground_right_state = "caution"
-
-                update_trajectory(f"{model_name}_{i}", cx, ref_y)
-
-            # -------------------
-            # Static 처리
-            # -------------------
-            elif model_name == "Static":
-                # 상단
-                if cv2.pointPolygonTest(head_roi[0], (cx, y1), False) >= 0:
-                    if label in static_head_allowed:
-                        print(label, static_head_allowed)
-                        if 0 < depth_m <= 2.0:
-                            head_state = "warning"
-                        elif 2.0 < depth_m <= 3.0:
-                            head_state = "caution"
-                # 하단 좌/우
-                if cv2.pointPolygonTest(ground_left[0], (cx, ref_y), False) >= 0:
-                    if label in static_ground_allowed:
-                        if 0 < depth_m <= 2.0:
-                            ground_left_state = "warning"
-                        elif 2.0 < depth_m <= 3.0:
-                            ground_left_state = "caution"
-                if cv2.pointPolygonTest(ground_right[0], (cx, ref_y), False) >= 0:
-                    if label in static_ground_allowed:
-                        if 0 < depth_m <= 2.0:
-                            ground_right_state = "warning"
-                        elif 2.0 < depth_m <= 3.0:
-                            ground_right_state = "caution"
-
-            # -------------------
-            # Surface 처리
-            # -------------------
-            elif model_name == "Surface":
-                if label not in surface_ground_allowed:
-                    continue
-                if cv2.pointPolygonTest(ground_left[0], (cx, ref_y), False) >= 0:
-                    if 0 < depth_m <= 2.0:
-                        ground_left_state = "warning"
-                    elif 2.0 < depth_m <= 3.0:
-                        ground_left_state = "caution"
-                elif cv2.pointPolygonTest(ground_right[0], (cx, ref_y), False) >= 0:
-                    if 0 < depth_m <= 2.0:
-                        ground_right_state = "warning"
-                    elif 2.0 < depth_m <= 3.0:
-                        ground_right_state = "caution"
-
-    # 최종 threat_level
-    if "warning" in [ground_left_state, ground_right_state, head_state]:
-        threat_level = "high"
-    elif "caution" in [ground_left_state, ground_right_state, head_state]:
-        threat_level = "medium"
+    if zones:
+        states = hazard.zone_states(np.concatenate(zones), np.concatenate(sevs))
     else:
-        threat_level = "low"
-    
-    # ROI 시각화
-    overlay = color_img.copy()
-    def state_to_color(state):
-        if state == "safe":
-            return (0, 255, 0)
-        if state == "caution":
-            return (0, 255, 255)
-        if state == "warning":
-            return (0, 0, 255)
-        return (50, 50, 50)
-
-    left_color = state_to_color(ground_left_state)
-    right_color = state_to_color(ground_right_state)
-    head_color = state_to_color(head_state)
-
-    cv2.fillPoly(overlay, ground_left, left_color)
-    cv2.fillPoly(overlay, ground_right, right_color)
-    cv2.fillPoly(overlay, head_roi, head_color)
-
-    display = cv2.addWeighted(overlay, 0.35, color_img, 0.65, 0)
-    cv2.polylines(display, ground_left, True, left_color, 2)
-    cv2.polylines(display, ground_right, True, right_color, 2)
-    cv2.polylines(display, head_roi, True, head_color, 2)
-
-    cv2.putText(display,
-                f"Ground-L: {ground_left_state}  Ground-R: {ground_right_state}  Head: {head_state}",
-                (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
-
-    route_stream.last_frame = display.copy()
-
-    return detections, {
-        "ground_left": ground_left_state,
-        "ground_right": ground_right_state,
-        "head": head_state
-    }, threat_level
+        states = hazard.zone_states(np.zeros(0, np.uint8), np.zeros(0, np.int8))
+    return detections, states
+
+def analyze(color_img, depth_img, shared_results, session, scale=1):
+    H, W = color_img.shape[:2]
+    detections, states = classify(shared_results, depth_img, W, H, session, scale)
+    threat_level = hazard.threat_level(states)
+    session.record(states, threat_level)
+    # 시각화는 /stream 시청자가 프레임을 가져갈 때만 (시청자 속도로) 수행
+    session.hub.publish_lazy(session.overlay.render, color_img, states)
+    return detections, states, threat_level
+
+# -----------------------
+# YOLO 처리 함수
+# -----------------------
+# device_id: 기기(사용자) 세션 키 (None 이면 기본 세션)
+async def detect(color_file, depth_file, device_id=None):
+    color_bytes = await color_file.read()
+    depth_bytes = await depth_file.read()
+    return await detect_bytes(color_bytes, depth_bytes, device_id)
+
+async def detect_bytes(color_bytes, depth_bytes, device_id=None):
+    return await _detect(device_id, decode_frames, color_bytes, depth_bytes)
+
+async def detect_frame(buf, device_id=None):
+    return await _detect(device_id, decode_container, buf)
+
+async def _detect(device_id, decode_fn, *args):
+    session = sessions.get(device_id)
+    t0 = time.perf_counter()
+    # 이미지 복원
+    color_img, depth_img, scale, (frame_no, ref, run_paths, cached) = \
+        await frame_engine.run(prepare, session, decode_fn, *args)
+
+    # 주기가 된 가중치만 1회 추론 (나머지는 캐시 결과), 이후 역할별 위험 판정
+    fresh = await run_inference(color_img, run_paths) if run_paths else {}
+    session.cadence.store(frame_no, ref, fresh)
+    shared_results = {**cached, **fresh}
+    detections, states, threat_level = await frame_engine.run(analyze, color_img, depth_img, shared_results, session, scale)
+
+    # 탐지 지연 기록 → 예산 초과 시 BLIP/Whisper 작업 보류
+    scheduler.record_detect_latency(time.perf_counter() - t0)
+
+    return detections, states, threat_level